@@ -11,214 +11,361 @@ Usage:
 import sys
 import os
 import io
+import mmap
 import struct
 import gzip
 import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from sys import intern as _intern
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 BLD_DIR    = os.path.join(SCRIPT_DIR, "BLD EXAMPLES")
 OUT_DIR    = os.path.join(SCRIPT_DIR, "extracted_xml")
 
-TARGET_FIELD = "<ComplianceXML>k__BackingField"
+# Interned so the per-field equality check in read_class_values hits
+# CPython's identity fast path for names read via lps_interned().
+TARGET_FIELD = _intern("<ComplianceXML>k__BackingField")
+
+# Precompiled Struct unpackers — avoids re-parsing the format string on
+# every read (these run once per field across tens of thousands of records).
+# unpack_from reads straight out of the backing buffer at an offset, so the
+# hot paths never allocate an intermediate bytes object.
+_S_I16 = struct.Struct('<h').unpack_from
+_S_U16 = struct.Struct('<H').unpack_from
+_S_I32 = struct.Struct('<i').unpack_from
+_S_U32 = struct.Struct('<I').unpack_from
+_S_I64 = struct.Struct('<q').unpack_from
+_S_U64 = struct.Struct('<Q').unpack_from
+_S_F32 = struct.Struct('<f').unpack_from
+_S_F64 = struct.Struct('<d').unpack_from
+
+# PrimitiveTypeEnum -> byte width, indexed by tc (0 where not fixed-width).
+# Hoisted so primitive()/array reads don't rebuild a size dict per call.
+_PRIM_SIZES = (0, 1, 1, 2, 0, 0, 8, 2, 4, 8, 1, 4, 8, 8, 2, 4, 8)
+
+# Shared singletons for the no-payload member-type extras — read_extra runs
+# once per class field, and these four never vary.
+_EXTRA_STRING = ('String', None)
+_EXTRA_OBJECT = ('Object', None)
+_EXTRA_OBJARR = ('ObjArr', None)
+_EXTRA_STRARR = ('StrArr', None)
+
+# MS-NRBF PrimitiveTypeEnum -> unpack_from for the fixed-width types
+_PRIM_UNPACK = {
+    3:  _S_U16,   # Char (UTF-16 code unit)
+    6:  _S_F64,   # Double
+    7:  _S_I16,   # Int16
+    8:  _S_I32,   # Int32
+    9:  _S_I64,   # Int64
+    10: struct.Struct('<b').unpack_from,  # SByte
+    11: _S_F32,   # Single
+    12: _S_I64,   # TimeSpan
+    13: _S_I64,   # DateTime
+    14: _S_U16,   # UInt16
+    15: _S_U32,   # UInt32
+    16: _S_U64,   # UInt64
+}
 
 # ---------------------------------------------------------------------------
 # Minimal MS-NRBF parser
 # Spec: https://docs.microsoft.com/en-us/openspecs/windows_protocols/ms-nrbf
 # ---------------------------------------------------------------------------
 
+class _FoundXML(Exception):
+    """Raised to unwind the parse the instant found_xml is set — the rest of
+    the record stream (often megabytes of array data) is irrelevant."""
+
+
 class NrbfReader:
     def __init__(self, data: bytes):
-        self.s = io.BytesIO(data)
-        self.classes = {}   # object_id -> (class_name, [field_names], [bin_types], [extras])
+        self.buf = data     # raw buffer; self.pos is an integer cursor into it
+        self.mv = memoryview(data)  # zero-copy slices for bulk array reads
+        self.pos = 0
+        self.end = len(data)
+        # object_id -> (class_name, [field_names], [bin_types], [extras], [readers]).
+        # Object IDs are small dense ints in practice, so class defs live in a
+        # flat list (plain array indexing on the hot ClassWithId path) with a
+        # dict spillover for anything out of range.
+        self.classes = [None] * 65536
+        self.classes_ovf = {}
         self.objects = {}   # object_id -> value
         self.libraries = {} # lib_id -> name
         self.found_xml = None  # set when we find it
+        # The happy path (target field hit mid-parse) never consults
+        # self.objects, so skip building that duplicate object graph by
+        # default; run() re-parses with tracking on when the Ref-resolution
+        # fallback actually needs it.
+        self.track_objects = False
+        self._resolve_cache = {}  # starting ref_id -> resolved value
+        self._str_cache = {}      # raw name bytes -> decoded interned str
+        # Jump table: record type -> bound handler, indexed directly by rt
+        self._handlers = [
+            self._h_header,                             # 0
+            self._h_class_with_id,                      # 1
+            partial(self.class_record, False, True),    # 2: SystemClassWithMembers
+            partial(self.class_record, False, False),   # 3: ClassWithMembers
+            partial(self.class_record, True, True),     # 4: SystemClassWithMembersAndTypes
+            partial(self.class_record, True, False),    # 5: ClassWithMembersAndTypes
+            self._h_obj_string,                         # 6
+            self.binary_array,                          # 7
+            self._h_member_prim,                        # 8
+            self._h_member_ref,                         # 9
+            self._h_null,                               # 10
+            self._h_msg_end,                            # 11
+            self._h_binary_lib,                         # 12
+            self._h_null_mul256,                        # 13
+            self._h_null_mul,                           # 14
+            partial(self.single_array, 15),             # 15: ArraySinglePrimitive
+            partial(self.single_array, 16),             # 16: ArraySingleObject
+            partial(self.single_array, 17),             # 17: ArraySingleString
+        ]
 
     # --- low-level reads ---
     def byte(self):
-        b = self.s.read(1)
-        if not b: raise EOFError
-        return b[0]
+        try:
+            b = self.buf[self.pos]
+        except IndexError:
+            raise EOFError
+        self.pos += 1
+        return b
 
     def int32(self):
-        return struct.unpack('<i', self.s.read(4))[0]
+        v = _S_I32(self.buf, self.pos)[0]
+        self.pos += 4
+        return v
 
     def varint(self):
-        r, shift = 0, 0
-        for _ in range(5):
-            b = self.byte()
-            r |= (b & 0x7F) << shift
-            if not (b & 0x80): return r
-            shift += 7
-        return r
+        # Unrolled 5-byte varint decode (MS-NRBF lengths are at most 5 bytes).
+        # Short field names make 1-2 byte values the overwhelmingly common
+        # case, so early exits beat the shift-accumulate loop.
+        buf, p = self.buf, self.pos
+        try:
+            b0 = buf[p]
+            if b0 < 0x80:
+                self.pos = p + 1
+                return b0
+            b1 = buf[p + 1]
+            if b1 < 0x80:
+                self.pos = p + 2
+                return (b0 & 0x7F) | (b1 << 7)
+            b2 = buf[p + 2]
+            if b2 < 0x80:
+                self.pos = p + 3
+                return (b0 & 0x7F) | ((b1 & 0x7F) << 7) | (b2 << 14)
+            b3 = buf[p + 3]
+            if b3 < 0x80:
+                self.pos = p + 4
+                return (b0 & 0x7F) | ((b1 & 0x7F) << 7) | ((b2 & 0x7F) << 14) | (b3 << 21)
+            b4 = buf[p + 4]
+            self.pos = p + 5
+            return ((b0 & 0x7F) | ((b1 & 0x7F) << 7) | ((b2 & 0x7F) << 14)
+                    | ((b3 & 0x7F) << 21) | ((b4 & 0x7F) << 28))
+        except IndexError:
+            raise EOFError
 
     def lps(self):
         """Length-prefixed string"""
         n = self.varint()
-        return self.s.read(n).decode('utf-8', errors='replace')
+        p = self.pos
+        self.pos = p + n
+        return self.buf[p:p + n].decode('utf-8', errors='replace')
+
+    def lps_interned(self):
+        """Length-prefixed string, interned — for class/field names, which
+        recur across class definitions and get compared against TARGET_FIELD.
+        Cached on the raw bytes so repeats skip the UTF-8 decode entirely."""
+        n = self.varint()
+        p = self.pos
+        self.pos = p + n
+        raw = self.buf[p:p + n]
+        s = self._str_cache.get(raw)
+        if s is None:
+            s = _intern(raw.decode('utf-8', errors='replace'))
+            self._str_cache[raw] = s
+        return s
 
     def primitive(self, tc):
-        sizes = {1:1, 2:1, 3:2, 6:8, 7:2, 8:4, 9:8, 10:1, 11:4, 12:8, 13:8, 14:2, 15:4, 16:8}
         if tc == 5:   return self.lps()   # Decimal stored as string
         if tc == 18:  return self.lps()   # String
-        if tc in sizes:
-            raw = self.s.read(sizes[tc])
-            if tc == 1:  return bool(raw[0])
-            if tc == 2:  return raw[0]
-            if tc == 3:  return raw[0] | (raw[1] << 8)
-            if tc == 6:  return struct.unpack('<d', raw)[0]
-            if tc == 7:  return struct.unpack('<h', raw)[0]
-            if tc == 8:  return struct.unpack('<i', raw)[0]
-            if tc == 9:  return struct.unpack('<q', raw)[0]
-            if tc == 10: return struct.unpack('<b', raw)[0]
-            if tc == 11: return struct.unpack('<f', raw)[0]
-            if tc == 12: return struct.unpack('<q', raw)[0]  # TimeSpan
-            if tc == 13: return struct.unpack('<q', raw)[0]  # DateTime
-            if tc == 14: return struct.unpack('<H', raw)[0]
-            if tc == 15: return struct.unpack('<I', raw)[0]
-            if tc == 16: return struct.unpack('<Q', raw)[0]
-        return None
+        if tc == 1:   return bool(self.byte())
+        if tc == 2:   return self.byte()
+        # 1-2 byte integers: direct buffer indexing beats struct dispatch
+        # (no slice, no unpack tuple) for these widths
+        if tc == 10:                      # SByte
+            b = self.byte()
+            return b - 256 if b >= 128 else b
+        if tc == 3 or tc == 14:           # Char / UInt16
+            p = self.pos
+            self.pos = p + 2
+            return self.buf[p] | (self.buf[p + 1] << 8)
+        if tc == 7:                       # Int16
+            p = self.pos
+            self.pos = p + 2
+            v = self.buf[p] | (self.buf[p + 1] << 8)
+            return v - 65536 if v >= 32768 else v
+        fn = _PRIM_UNPACK.get(tc)
+        if fn is None:
+            return None
+        v = fn(self.buf, self.pos)[0]
+        self.pos += _PRIM_SIZES[tc]
+        return v
 
     # --- member type extra info ---
     def read_extra(self, bt):
         if bt == 0:   return ('Prim', self.byte())
-        if bt == 1:   return ('String', None)
-        if bt == 2:   return ('Object', None)
+        if bt == 1:   return _EXTRA_STRING
+        if bt == 2:   return _EXTRA_OBJECT
         if bt == 3:   return ('SysClass', self.lps())
         if bt == 4:   return ('Class', self.lps(), self.int32())
-        if bt == 5:   return ('ObjArr', None)
-        if bt == 6:   return ('StrArr', None)
+        if bt == 5:   return _EXTRA_OBJARR
+        if bt == 6:   return _EXTRA_STRARR
         if bt == 7:   return ('PrimArr', self.byte())
         return ('Unk', bt)
 
     # --- record reading ---
     def record(self):
-        rt = self.byte()
+        # Inlined byte() — this is the single hottest call site in the parser
+        # (once per record, millions of times on a big file).
+        try:
+            rt = self.buf[self.pos]
+        except IndexError:
+            raise EOFError
+        self.pos += 1
         return self.record_of_type(rt)
 
     def record_of_type(self, rt):
-
-        # 0: Header
-        if rt == 0:
-            root = self.int32(); self.s.read(12)
-            return ('Header', root)
-
-        # 12: BinaryLibrary — no data, read next
-        if rt == 12:
-            lid = self.int32(); name = self.lps()
-            self.libraries[lid] = name
-            return self.record()   # transparent
-
-        # 11: MessageEnd
-        if rt == 11:
-            return ('END',)
-
-        # 10: ObjectNull
-        if rt == 10:
-            return None
-
-        # 13: ObjectNullMultiple256
-        if rt == 13:
-            return [None] * self.byte()
-
-        # 14: ObjectNullMultiple
-        if rt == 14:
-            return [None] * self.int32()
-
-        # 6: BinaryObjectString
-        if rt == 6:
-            oid = self.int32(); val = self.lps()
+        # Dispatch through the per-instance jump table built in __init__ —
+        # one list index instead of walking an if/elif ladder per record.
+        if rt > 17:
+            raise ValueError(f"Unknown record type {rt} at offset {self.pos}")
+        return self._handlers[rt]()
+
+    # --- per-record-type handlers (indexed by _handlers) ---
+
+    def _h_header(self):        # 0: Header
+        root = self.int32(); self.pos += 12
+        return ('Header', root)
+
+    def _h_class_with_id(self): # 1: ClassWithId (reuses prior class definition)
+        oid = self.int32(); meta_id = self.int32()
+        if 0 <= meta_id < 65536:
+            cdef = self.classes[meta_id]
+        else:
+            cdef = self.classes_ovf.get(meta_id)
+        if cdef is None:
+            raise ValueError(f"ClassWithId references unknown meta_id {meta_id}")
+        return self.read_class_values(oid, *cdef)
+
+    def _h_obj_string(self):    # 6: BinaryObjectString
+        oid = self.int32(); val = self.lps()
+        if self.track_objects:
             self.objects[oid] = val
-            return val
-
-        # 8: MemberPrimitiveTyped
-        if rt == 8:
-            tc = self.byte(); return self.primitive(tc)
-
-        # 9: MemberReference
-        if rt == 9:
-            ref_id = self.int32()
-            return ('Ref', ref_id)
-
-        # 5: ClassWithMembersAndTypes
-        if rt == 5:
-            return self.class_record(with_types=True, sys=False)
+        return val
 
-        # 4: SystemClassWithMembersAndTypes
-        if rt == 4:
-            return self.class_record(with_types=True, sys=True)
+    def _h_member_prim(self):   # 8: MemberPrimitiveTyped
+        tc = self.byte(); return self.primitive(tc)
 
-        # 3: ClassWithMembers
-        if rt == 3:
-            return self.class_record(with_types=False, sys=False)
+    def _h_member_ref(self):    # 9: MemberReference
+        ref_id = self.int32()
+        return ('Ref', ref_id)
 
-        # 2: SystemClassWithMembers
-        if rt == 2:
-            return self.class_record(with_types=False, sys=True)
+    def _h_null(self):          # 10: ObjectNull
+        return None
 
-        # 1: ClassWithId (reuses prior class definition)
-        if rt == 1:
-            oid = self.int32(); meta_id = self.int32()
-            cdef = self.classes.get(meta_id)
-            if cdef is None:
-                raise ValueError(f"ClassWithId references unknown meta_id {meta_id}")
-            cname, fnames, btypes, extras = cdef
-            return self.read_class_values(oid, cname, fnames, btypes, extras)
+    def _h_msg_end(self):       # 11: MessageEnd
+        return ('END',)
 
-        # 7: BinaryArray
-        if rt == 7:
-            return self.binary_array()
+    def _h_binary_lib(self):    # 12: BinaryLibrary — no data, read next
+        lid = self.int32(); name = self.lps()
+        self.libraries[lid] = name
+        return self.record()   # transparent
 
-        # 15/16/17: Single arrays
-        if rt in (15, 16, 17):
-            return self.single_array(rt)
+    def _h_null_mul256(self):   # 13: ObjectNullMultiple256
+        return [None] * self.byte()
 
-        raise ValueError(f"Unknown record type {rt} at offset {self.s.tell()}")
+    def _h_null_mul(self):      # 14: ObjectNullMultiple
+        return [None] * self.int32()
 
     def class_record(self, with_types, sys):
         oid = self.int32()
-        cname = self.lps()
+        cname = self.lps_interned()
         n = self.int32()
-        fnames = [self.lps() for _ in range(n)]
+        fnames = [self.lps_interned() for _ in range(n)]
 
         if with_types:
             btypes = [self.byte() for _ in range(n)]
             extras = [self.read_extra(bt) for bt in btypes]
         else:
             btypes = [2] * n   # Object type
-            extras = [('Object', None)] * n
+            extras = [_EXTRA_OBJECT] * n
 
         if not sys:
             self.int32()  # library id
 
-        self.classes[oid] = (cname, fnames, btypes, extras)
-        return self.read_class_values(oid, cname, fnames, btypes, extras)
+        # Bind a primitive reader per field at definition time, so reading
+        # values (which happens once per ClassWithId reuse) skips the
+        # extras-tuple indexing and dispatch.
+        readers = [partial(self.primitive, ex[1]) if bt == 0 else None
+                   for bt, ex in zip(btypes, extras)]
 
-    def read_class_values(self, oid, cname, fnames, btypes, extras):
-        vals = {}
+        cdef = (cname, fnames, btypes, extras, readers)
+        if 0 <= oid < 65536:
+            self.classes[oid] = cdef
+        else:
+            self.classes_ovf[oid] = cdef
+        return self.read_class_values(oid, *cdef)
+
+    def read_class_values(self, oid, cname, fnames, btypes, extras, readers):
+        if not self.track_objects:
+            # Scan-only pass: advance the cursor and watch for the target
+            # field, but don't build the value dict — virtually all of the
+            # graph is discarded, so skipping materialization is the single
+            # biggest win on the first pass.
+            skip = 0
+            for fname, bt, reader in zip(fnames, btypes, readers):
+                if skip > 0:
+                    skip -= 1
+                    continue
+                if bt == 0:  # inline primitive
+                    v = reader()
+                else:
+                    v = self.record()
+                    if isinstance(v, list):  # ObjectNullMultiple
+                        skip = len(v) - 1
+                        continue
+                if fname == TARGET_FIELD and isinstance(v, str) and len(v) > 100:
+                    self.found_xml = v
+                    raise _FoundXML
+            return None
+
+        # Write fields straight into the result dict — a separate vals dict
+        # plus a **splat would copy every field a second time.
+        obj = {'__class__': cname}
         skip = 0
-        for fname, bt, ex in zip(fnames, btypes, extras):
+        for fname, bt, reader in zip(fnames, btypes, readers):
             if skip > 0:
-                vals[fname] = None
+                obj[fname] = None
                 skip -= 1
                 continue
 
             if bt == 0:  # inline primitive
-                vals[fname] = self.primitive(ex[1])
+                obj[fname] = reader()
             else:
                 v = self.record()
                 # ObjectNullMultiple returns a list of Nones
                 if isinstance(v, list):
-                    vals[fname] = None
+                    obj[fname] = None
                     skip = len(v) - 1
                 else:
-                    vals[fname] = v
+                    obj[fname] = v
 
             # Check right here if we found the XML
-            if fname == TARGET_FIELD and isinstance(vals[fname], str) and len(vals[fname]) > 100:
-                self.found_xml = vals[fname]
+            if fname == TARGET_FIELD and isinstance(obj[fname], str) and len(obj[fname]) > 100:
+                self.found_xml = obj[fname]
+                raise _FoundXML
 
-        obj = {'__class__': cname, **vals}
         self.objects[oid] = obj
         return obj
 
@@ -237,13 +384,28 @@ class NrbfReader:
 
         if bt == 0:  # primitive array — read inline, return byte count
             tc = ex[1]
-            sizes = {1:1,2:1,3:2,6:8,7:2,8:4,9:8,10:1,11:4,12:8,13:8,14:2,15:4,16:8}
-            sz = sizes.get(tc, 4)
-            data = self.s.read(total * sz)
+            sz = (_PRIM_SIZES[tc] if 0 <= tc < len(_PRIM_SIZES) else 0) or 4
+            p = self.pos
+            self.pos = p + total * sz
+            if not self.track_objects:
+                return None  # scan-only: payload skipped, nothing retained
+            # memoryview: reference the mapped file instead of copying the
+            # array payload (these can be thousands of doubles we never use)
+            data = self.mv[p:self.pos]
             self.objects[oid] = data
             return data
 
         # object/class array
+        if not self.track_objects:
+            # scan-only: consume the element records without building a list
+            skip = 0
+            for _ in range(total):
+                if skip > 0:
+                    skip -= 1; continue
+                v = self.record()
+                if isinstance(v, list):
+                    skip = len(v) - 1
+            return None
         elems = []
         skip = 0
         for _ in range(total):
@@ -261,11 +423,23 @@ class NrbfReader:
         oid = self.int32(); length = self.int32()
         if rt == 15:   # ArraySinglePrimitive
             tc = self.byte()
-            sizes = {1:1,2:1,3:2,6:8,7:2,8:4,9:8,10:1,11:4,12:8,13:8,14:2,15:4,16:8}
-            sz = sizes.get(tc, 4)
-            data = self.s.read(length * sz)
+            sz = (_PRIM_SIZES[tc] if 0 <= tc < len(_PRIM_SIZES) else 0) or 4
+            p = self.pos
+            self.pos = p + length * sz
+            if not self.track_objects:
+                return None
+            data = self.mv[p:self.pos]
             self.objects[oid] = data
             return data
+        if not self.track_objects:
+            skip = 0
+            for _ in range(length):
+                if skip > 0:
+                    skip -= 1; continue
+                v = self.record()
+                if isinstance(v, list):
+                    skip = len(v) - 1
+            return None
         elems = []
         skip = 0
         for _ in range(length):
@@ -280,26 +454,51 @@ class NrbfReader:
         return elems
 
     def resolve(self, val):
-        """Follow Ref chains"""
+        """Follow Ref chains (memoized — several objects often forward to
+        the same target, and chains converge)"""
+        start = None
+        if isinstance(val, tuple) and val[0] == 'Ref':
+            start = val[1]
+            if start in self._resolve_cache:
+                return self._resolve_cache[start]
         seen = set()
         while isinstance(val, tuple) and val[0] == 'Ref':
             ref_id = val[1]
             if ref_id in seen: break
             seen.add(ref_id)
             val = self.objects.get(ref_id)
+        if start is not None:
+            self._resolve_cache[start] = val
         return val
 
+    def restart_tracked(self):
+        """Rewind and re-enable object tracking for a second parse pass."""
+        self.pos = 0
+        self.classes = [None] * 65536
+        self.classes_ovf = {}
+        self.objects = {}
+        self.libraries = {}
+        self.track_objects = True
+
     def run(self):
         try:
-            while True:
+            # Bounded by the cursor, so a well-formed stream finishes without
+            # ever raising; EOFError below only fires on truncated files.
+            while self.pos < self.end:
                 r = self.record()
                 if r == ('END',): break
-                if self.found_xml: break
+        except _FoundXML:
+            return
         except EOFError:
             pass
         except Exception as e:
             if self.found_xml:
                 return  # already got what we need
+            if not self.track_objects:
+                # First pass skipped object tracking; the Ref-resolution
+                # fallback below needs the graph, so parse again with it on.
+                self.restart_tracked()
+                return self.run()
             # Try to resolve any Ref-typed value for our target
             for oid, obj in self.objects.items():
                 if isinstance(obj, dict) and TARGET_FIELD in obj:
@@ -308,6 +507,60 @@ class NrbfReader:
                         self.found_xml = v
                         return
             raise
+        # Clean end of stream but no hit — the caller scans self.objects for
+        # a Ref-typed target, so make sure that graph actually got built.
+        if self.found_xml is None and not self.track_objects:
+            self.restart_tracked()
+            return self.run()
+
+
+# ---------------------------------------------------------------------------
+# Signature fast path
+# ---------------------------------------------------------------------------
+
+# Length-prefixed field name as it appears in a class definition:
+# 0x1e (= 30, the name's byte length) followed by the name itself.
+_SIG = bytes([len(TARGET_FIELD.encode())]) + TARGET_FIELD.encode()
+
+
+def _varint_at(data, p):
+    r, shift = 0, 0
+    for _ in range(5):
+        b = data[p]; p += 1
+        r |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return r, p
+        shift += 7
+    return r, p
+
+
+def fast_find_xml(data) -> str | None:
+    """Jump straight to the target field name with one C-level find, then
+    look for the BinaryObjectString holding its value in a bounded window.
+
+    The full record-by-record parse decodes the entire object graph just to
+    reach this one string; in the common EnergyPro layout the value record
+    sits a few dozen bytes after the field name, so this usually answers in
+    microseconds. Returns None (caller falls back to the real parser) when
+    the layout doesn't match.
+    """
+    start = data.find(_SIG)
+    if start == -1:
+        return None
+    # BinaryObjectString record: 0x06, int32 object id, varint length, utf-8
+    window_end = min(len(data), start + len(_SIG) + 256)
+    idx = data.find(b'\x06', start + len(_SIG))
+    while idx != -1 and idx < window_end:
+        try:
+            n, p = _varint_at(data, idx + 5)  # skip record type + object id
+            if 100 < n <= len(data) - p:
+                s = data[p:p + n].decode('utf-8', errors='replace')
+                if s.lstrip().startswith('<'):
+                    return s
+        except IndexError:
+            pass
+        idx = data.find(b'\x06', idx + 1)
+    return None
 
 
 # ---------------------------------------------------------------------------
@@ -315,28 +568,37 @@ class NrbfReader:
 # ---------------------------------------------------------------------------
 
 def scan_compressed(data: bytes) -> str | None:
-    # Try GZip
-    for i in range(len(data) - 2):
-        if data[i] == 0x1f and data[i+1] == 0x8b:
-            try:
-                dec = gzip.decompress(data[i:])
-                if b"<?xml" in dec or b"<Title24" in dec:
-                    return dec.decode('utf-8', errors='replace')
-            except Exception:
-                pass
-    # Try zlib
+    # Try GZip — bytes.find is a C-level substring search, so locating magic
+    # bytes this way beats iterating the file byte-by-byte in Python
+    idx = data.find(b"\x1f\x8b")
+    while idx != -1:
+        try:
+            dec = gzip.decompress(data[idx:])
+            if b"<?xml" in dec or b"<Title24" in dec:
+                return dec.decode('utf-8', errors='replace')
+        except Exception:
+            pass
+        idx = data.find(b"\x1f\x8b", idx + 1)
+    # Try zlib — collect every candidate offset for all three magics up
+    # front, then attempt decompression in file order
+    candidates = []
     for magic in (b"\x78\x9c", b"\x78\x01", b"\x78\xda"):
-        idx = 0
-        while True:
-            idx = data.find(magic, idx)
-            if idx == -1: break
-            try:
-                dec = zlib.decompress(data[idx:])
-                if b"<?xml" in dec or b"<Title24" in dec:
-                    return dec.decode('utf-8', errors='replace')
-            except Exception:
-                pass
-            idx += 1
+        idx = data.find(magic)
+        while idx != -1:
+            candidates.append(idx)
+            idx = data.find(magic, idx + 1)
+    for idx in sorted(candidates):
+        try:
+            # Decompress just the head first — a false-positive magic hit
+            # then costs a few KB of inflate instead of the whole tail
+            d = zlib.decompressobj()
+            head = d.decompress(data[idx:idx + 65536], 65536)
+            if b"<?xml" not in head and b"<Title24" not in head:
+                continue
+            dec = head + d.decompress(d.unconsumed_tail + data[idx + 65536:]) + d.flush()
+            return dec.decode('utf-8', errors='replace')
+        except Exception:
+            pass
     return None
 
 
@@ -348,17 +610,24 @@ def process(bld_path: str):
     print(f"\n{'='*60}")
     print(f"File: {os.path.basename(bld_path)}")
 
+    # Memory-map instead of reading the whole file into a bytes object —
+    # both NrbfReader (indexing/unpack_from) and scan_compressed (find/slices)
+    # work on a bytes-like mmap, and repeated runs hit the OS page cache.
     with open(bld_path, 'rb') as f:
-        data = f.read()
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            data = f.read()  # empty or unmappable file
 
     base = os.path.splitext(os.path.basename(bld_path))[0]
 
-    # 1. NRBF parse
-    xml = None
+    # 1. Signature fast path, then full NRBF parse
+    xml = fast_find_xml(data)
     try:
-        reader = NrbfReader(data)
-        reader.run()
-        xml = reader.found_xml
+        if xml is None:
+            reader = NrbfReader(data)
+            reader.run()
+            xml = reader.found_xml
         if xml is None:
             # Check all parsed objects for the target field
             for obj in reader.objects.values():
@@ -391,14 +660,33 @@ def process(bld_path: str):
     print("  ComplianceXML may be null (project not yet run through compliance).")
 
 
+def process_captured(bld_path: str) -> str:
+    """Run process() with stdout captured, so parallel workers' reports
+    don't interleave."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        try:
+            process(bld_path)
+        except Exception as e:
+            print(f"  ERROR: {e}")
+    return buf.getvalue()
+
+
 def main():
     os.makedirs(OUT_DIR, exist_ok=True)
     paths = sys.argv[1:] if len(sys.argv) > 1 else [
         os.path.join(BLD_DIR, f)
         for f in os.listdir(BLD_DIR) if f.lower().endswith('.bld')
     ]
-    for p in paths:
-        process(p)
+    if len(paths) > 1:
+        # Files are independent and parsing is CPU-bound — fan out across
+        # cores, printing each file's captured report as it completes.
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            for report in ex.map(process_captured, paths):
+                print(report, end="")
+    else:
+        for p in paths:
+            process(p)
     print(f"\nDone. Output: {OUT_DIR}")
 
 
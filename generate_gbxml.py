@@ -7,18 +7,32 @@ Usage:
   python generate_gbxml.py                          <- creates blank template
   python generate_gbxml.py "My Project.xlsx"        <- generates gbXML from filled template
   python generate_gbxml.py "My Project.xlsx" out.xml
+  python generate_gbxml.py --pretty "My Project.xlsx"  <- indented output
+  python generate_gbxml.py --regenerate-template    <- rebuild template from code
+
+Output is compact by default — EnergyPro does not need indentation, and
+pretty-printing is by far the most expensive part of the XML tail.
 """
 
 import sys
 import os
+import shutil
 import math
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape as xml_escape
+import numpy as np
 import openpyxl
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from t24_utils import ORIENTATION_MAP, parse_azimuth, az_to_cardinal
@@ -65,34 +79,65 @@ CONDITION_TYPE_MAP = {
     "plenum":            "Plenum",
 }
 
-HORIZONTAL_SURFACES = {"Roof", "SlabOnGrade", "ExposedFloor", "RaisedFloor",
-                       "UndergroundSlab", "Ceiling", "InteriorCeiling"}
+HORIZONTAL_SURFACES = frozenset({"Roof", "SlabOnGrade", "ExposedFloor", "RaisedFloor",
+                                 "UndergroundSlab", "Ceiling", "InteriorCeiling"})
+
+GBXML_NS = "http://www.gbxml.org/schema"
 
 
 # ---------------------------------------------------------------------------
 # Excel template creator
 # ---------------------------------------------------------------------------
 
-def make_header(ws, cols, fill_color="1F4E79", font_color="FFFFFF"):
-    hdr_fill = PatternFill("solid", fgColor=fill_color)
-    hdr_font = Font(bold=True, color=font_color)
-    thin = Side(style="thin")
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
-    for col_idx, (header, width) in enumerate(cols, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
+# Styles are immutable, so one instance of each can serve every cell —
+# fresh instances per row just make openpyxl dedupe them in its styles
+# table over and over.
+_HDR_FILL  = PatternFill("solid", fgColor="1F4E79")
+_HDR_FONT  = Font(bold=True, color="FFFFFF")
+_VAL_FILL  = PatternFill("solid", fgColor="EBF3FB")
+_NOTE_FONT = Font(italic=True, color="595959")
+_THIN      = Side(style="thin")
+_BORDER    = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_CTR_ALIGN = Alignment(horizontal="center", wrap_text=True)
+
+
+def make_header(ws, cols, hdr_fill=_HDR_FILL, hdr_font=_HDR_FONT):
+    # Bulk-append the header row, then style it in one pass — repeated
+    # ws.cell() coordinate lookups are an openpyxl hot spot.
+    ws.append([header for header, _ in cols])
+    for cell in ws[1]:
         cell.fill = hdr_fill
         cell.font = hdr_font
-        cell.alignment = Alignment(horizontal="center", wrap_text=True)
-        cell.border = border
+        cell.alignment = _CTR_ALIGN
+        cell.border = _BORDER
+    for col_idx, (_, width) in enumerate(cols, start=1):
         ws.column_dimensions[get_column_letter(col_idx)].width = width
 
 def add_note_row(ws, text, col_count):
     r = ws.max_row + 1
     cell = ws.cell(row=r, column=1, value="# " + text)
-    cell.font = Font(italic=True, color="595959")
+    cell.font = _NOTE_FONT
     ws.merge_cells(start_row=r, start_column=1, end_row=r, end_column=col_count)
 
-def create_template(path: str):
+_TEMPLATE_ASSET = "_template_asset.xlsx"
+
+def create_template(path: str, regenerate: bool = False):
+    """Copy the pre-built template asset into place.
+
+    The template is a fixed workbook, so it is materialized once and
+    checked in next to this script — creating one becomes a file copy
+    instead of hundreds of openpyxl cell/style constructions. Pass
+    regenerate=True (--regenerate-template) to rebuild the asset from
+    the code below first.
+    """
+    asset = os.path.join(SCRIPT_DIR, _TEMPLATE_ASSET)
+    if regenerate or not os.path.exists(asset):
+        build_template(asset)
+    if os.path.abspath(path) != asset:
+        shutil.copy(asset, path)
+    print(f"Template created: {path}")
+
+def build_template(path: str):
     wb = Workbook()
 
     # ── Tab 1: Project ──────────────────────────────────────────────────────
@@ -110,21 +155,19 @@ def create_template(path: str):
         ("Standards Version", "2022"),
         ("Notes",             ""),
     ]
-    hdr_fill = PatternFill("solid", fgColor="1F4E79")
-    val_fill = PatternFill("solid", fgColor="EBF3FB")
-    note_fill = PatternFill("solid", fgColor="FFF2CC")
     for r, (label, value) in enumerate(info, start=2):
-        lc = ws.cell(row=r, column=1, value=label)
-        lc.fill = hdr_fill
-        lc.font = Font(bold=True, color="FFFFFF")
-        vc = ws.cell(row=r, column=2, value=value)
-        vc.fill = val_fill
+        ws[f"A{r}"] = label
+        ws[f"B{r}"] = value
+    for lc, vc in ws[f"A2:B{1 + len(info)}"]:
+        lc.fill = _HDR_FILL
+        lc.font = _HDR_FONT
+        vc.fill = _VAL_FILL
 
     # Building type note
     note = ws.cell(row=10, column=1,
         value="# Building Type options: SingleFamily, MultiFamily, Office, RetailStore, "
               "Warehouse, Hotel, School, MedicalOffice, HighriseResidential, MidriseApartment")
-    note.font = Font(italic=True, color="595959")
+    note.font = _NOTE_FONT
     ws.merge_cells("A10:B10")
 
     # ── Tab 2: Zones ────────────────────────────────────────────────────────
@@ -143,9 +186,8 @@ def create_template(path: str):
         ("Z-102",   "Unit 102", 900,  8,  "Conditioned", "Residential"),
         ("Z-LOBBY", "Lobby",    400,  10, "Conditioned", "Lobby"),
     ]
-    for r, row in enumerate(sample_zones, start=2):
-        for c, val in enumerate(row, start=1):
-            ws2.cell(row=r, column=c, value=val)
+    for row in sample_zones:
+        ws2.append(row)
     add_note_row(ws2,
         "Condition Type options: Conditioned, Heated Only, Cooled Only, Unconditioned, Semi-Heated, Plenum",
         6)
@@ -174,9 +216,8 @@ def create_template(path: str):
         ("W-101-RF", "Z-101", "Roof",        "Roof",          "",       651, "R-38 Roof",             ""),
         ("W-101-SL", "Z-101", "Slab",        "Slab on Grade", "",       651, "Slab-on-Grade",         ""),
     ]
-    for r, row in enumerate(sample_walls, start=2):
-        for c, val in enumerate(row, start=1):
-            ws3.cell(row=r, column=c, value=val)
+    for row in sample_walls:
+        ws3.append(row)
     add_note_row(ws3,
         "Gross Area = total surface area INCLUDING windows/doors/skylights. "
         "Orientation required for exterior walls (leave blank for roofs and slabs).",
@@ -201,55 +242,265 @@ def create_template(path: str):
         ("O-101-E-1",  "W-101-E",  "East Door",       "Door",     24,   0.50, ""),
         ("O-101-SK-1", "W-101-RF", "Skylight A",      "Skylight", 12,   0.50, 0.25),
     ]
-    for r, row in enumerate(sample_openings, start=2):
-        for c, val in enumerate(row, start=1):
-            ws4.cell(row=r, column=c, value=val)
+    for row in sample_openings:
+        ws4.append(row)
     add_note_row(ws4,
         "Skylights reference a Roof Wall ID. U-Factor and SHGC required for windows and skylights; "
         "leave SHGC blank for doors.",
         7)
 
     wb.save(path)
-    print(f"Template created: {path}")
 
 
 # ---------------------------------------------------------------------------
 # gbXML generator
 # ---------------------------------------------------------------------------
 
-def resolve_azimuth(orientation_str) -> float:
-    return parse_azimuth(orientation_str)
+# The resolvers see the same handful of distinct strings over and over
+# (a takeoff has a few orientations and surface types across thousands of
+# rows), so memoizing turns the strip/lower/lookup chain into a dict hit.
+# Inputs come from values_only=True iteration and are always hashable.
 
+# ORIENTATION_MAP values are ints; pre-float them once so the lookup
+# returns the final value with no per-call conversion.
+_ORIENT_LOOKUP = {k: float(v) for k, v in ORIENTATION_MAP.items()}
+
+@functools.lru_cache(maxsize=256)
+def resolve_azimuth(orientation_str) -> float:
+    # Cells read with values_only=True are already numeric for degree
+    # entries — return them without any string coercion. Exact __class__
+    # checks skip the isinstance MRO walk on this hot path.
+    if orientation_str is None or orientation_str == "":
+        return 0.0
+    if orientation_str.__class__ is float:
+        return orientation_str
+    if orientation_str.__class__ is int:
+        return float(orientation_str)
+    k = str(orientation_str).strip().lower()
+    az = _ORIENT_LOOKUP.get(k)
+    if az is not None:
+        return az
+    try:
+        return float(k)       # numeric strings ("45", "202.5")
+    except ValueError:
+        return 0.0
+
+@functools.lru_cache(maxsize=256)
 def resolve_surface_type(type_str) -> str:
     return SURFACE_TYPE_MAP.get(str(type_str).strip().lower(), "ExteriorWall")
 
+@functools.lru_cache(maxsize=256)
 def resolve_opening_type(type_str) -> str:
     return OPENING_TYPE_MAP.get(str(type_str).strip().lower(), "FixedWindow")
 
+@functools.lru_cache(maxsize=256)
 def resolve_condition_type(type_str) -> str:
     return CONDITION_TYPE_MAP.get(str(type_str).strip().lower(), "HeatedAndCooled")
 
-def tilt_for_surface(surface_type: str) -> float:
-    return 0.0 if surface_type in HORIZONTAL_SURFACES else 90.0
+@functools.lru_cache(maxsize=4096)
+def _norm_id(x):
+    """Normalize a cell value into a gbXML-safe id.
 
-def add_rect_geometry(parent, azimuth: float, tilt: float, width: float, height: float):
-    """Add RectangularGeometry child — this is what EnergyPro reads for area and orientation."""
-    rg = ET.SubElement(parent, "RectangularGeometry")
-    ET.SubElement(rg, "Azimuth").text  = f"{azimuth:.4f}"
-    cp = ET.SubElement(rg, "CartesianPoint")
-    for coord in ("0", "0", "0"):
-        ET.SubElement(cp, "Coordinate").text = coord
-    ET.SubElement(rg, "Width").text  = f"{width:.4f}"
-    ET.SubElement(rg, "Height").text = f"{height:.4f}"
-    ET.SubElement(rg, "Tilt").text   = f"{tilt:.4f}"
+    IDs repeat heavily across tabs (each zone id shows up again on every
+    wall and adjacency row), so cache the normalization and intern the
+    result — interned keys let dict lookups short-circuit on identity.
+    """
+    return sys.intern(str(x or "").strip().replace(" ", "_"))
 
+# The resolvers return a closed set of surface types, so horizontality
+# and tilt can be precomputed per type — one dict hit per wall instead of
+# a set-membership hash plus a function call.
+_IS_HORIZONTAL = {v: (v in HORIZONTAL_SURFACES) for v in set(SURFACE_TYPE_MAP.values())}
+_TILT = {v: (0.0 if h else 90.0) for v, h in _IS_HORIZONTAL.items()}
 
-def generate_gbxml(xlsx_path: str, out_path: str):
-    wb = openpyxl.load_workbook(xlsx_path)
+def tilt_for_surface(surface_type: str) -> float:
+    return _TILT.get(surface_type, 90.0)
+
+def _derive_geom_py(areas, heights, horiz):
+    """NumPy fallback for _derive_geom when numba is unavailable."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Flat surface — square approximation; vertical wall — height =
+        # zone ceiling height, width = area / height.
+        side       = np.where(areas > 0, np.sqrt(areas), 1.0)
+        rg_widths  = np.where(horiz, side, np.where(heights > 0, areas / heights, areas))
+        rg_heights = np.where(horiz, side, heights)
+    tilts = np.where(horiz, 0.0, 90.0)
+    return rg_widths, rg_heights, tilts
+
+try:
+    from numba import njit
+
+    @njit(fastmath=True, cache=True)
+    def _derive_geom(areas, heights, horiz):
+        n = areas.size
+        widths  = np.empty(n)
+        heights_out = np.empty(n)
+        tilts   = np.empty(n)
+        for i in range(n):
+            a = areas[i]
+            if horiz[i]:
+                # Flat surface — square approximation
+                side = math.sqrt(a) if a > 0 else 1.0
+                widths[i]  = side
+                heights_out[i] = side
+                tilts[i] = 0.0
+            else:
+                # Vertical wall — height = zone ceiling height, width = area / height
+                h = heights[i]
+                widths[i]  = a / h if h > 0 else a
+                heights_out[i] = h
+                tilts[i] = 90.0
+        return widths, heights_out, tilts
+
+    # Warm the JIT with a tiny input so real workbooks never pay compile
+    # time (cache=True persists the compiled kernel across runs).
+    _derive_geom(np.zeros(1), np.zeros(1), np.zeros(1, dtype=np.bool_))
+except ImportError:
+    _derive_geom = _derive_geom_py
+
+# The gbXML 6.01 element layout is fixed, so the writer is specialized to
+# it: every element becomes a pre-composed f-string fragment and only the
+# free-text fields pass through xml_escape. This skips per-element tag
+# validation, namespace resolution and Element allocation entirely.
+
+_ATTR_ESC = {'"': "&quot;"}   # extra entity for attribute context
+
+
+@functools.lru_cache(maxsize=4096)
+def _fmt4(x: float) -> str:
+    """Format to 4 decimals through a cache — azimuths and tilts take only
+    a handful of distinct values across a building, and widths/heights
+    cluster heavily."""
+    return f"{x:.4f}"
+
+
+def _format_rect_geometry(azimuth: float, tilt: float, width: float, height: float) -> str:
+    """RectangularGeometry fragment — what EnergyPro reads for area and orientation."""
+    return (f"<RectangularGeometry><Azimuth>{_fmt4(azimuth)}</Azimuth>"
+            "<CartesianPoint>"
+            "<Coordinate>0</Coordinate><Coordinate>0</Coordinate><Coordinate>0</Coordinate>"
+            "</CartesianPoint>"
+            f"<Width>{_fmt4(width)}</Width><Height>{_fmt4(height)}</Height>"
+            f"<Tilt>{_fmt4(tilt)}</Tilt></RectangularGeometry>")
+
+
+def _format_window_type(wt_id, ufactor, shgc) -> str:
+    name = f"U-{ufactor:.2f}" + (f" SHGC-{shgc:.2f}" if shgc is not None else "")
+    shgc_el = f"<SHGC>{shgc}</SHGC>" if shgc is not None else ""
+    return (f'<WindowType id="{wt_id}"><Name>{name}</Name>'
+            f"<Uvalue>{ufactor}</Uvalue>{shgc_el}</WindowType>")
+
+
+def _format_space(z, safe_name) -> str:
+    occ = f' occupancyType="{xml_escape(z["occ_type"], _ATTR_ESC)}"' if z["occ_type"] else ""
+    return (f'<Space id="{xml_escape(safe_name, _ATTR_ESC)}"'
+            f' zoneIdRef="{xml_escape(safe_name, _ATTR_ESC)}"'
+            f' conditionType="{z["cond_type"]}"{occ}>'
+            f'<Name>{xml_escape(z["name"])}</Name>'
+            f'<Area>{z["area"]}</Area>'
+            f'<Volume>{round(z["area"] * z["height"], 2)}</Volume>'
+            f'<CeilingHeight>{z["height"]}</CeilingHeight></Space>')
+
+
+def _format_opening(o, azimuth, tilt, wt_id) -> str:
+    wt_attr = f' windowTypeIdRef="{wt_id}"' if wt_id else ""
+    # RectangularGeometry — EnergyPro reads area from Width x Height
+    side = math.sqrt(o["area"]) if o["area"] > 0 else 1.0
+    return (f'<Opening id="{xml_escape(o["id"], _ATTR_ESC)}"'
+            f' openingType="{o["type"]}"{wt_attr}>'
+            f'<Name>{xml_escape(o["name"])}</Name>'
+            + _format_rect_geometry(azimuth, tilt, side, side)
+            + "</Opening>")
+
+
+def _format_surface(w, openings, space_ref, adj_ref, window_types) -> str:
+    parts = [f'<Surface id="{xml_escape(w["id"], _ATTR_ESC)}"'
+             f' surfaceType="{w["surface_type"]}">'
+             f'<Name>{xml_escape(w["name"])}</Name>']
+    if w["construction"]:
+        parts.append(f'<CADObjectId>{xml_escape(w["construction"])}</CADObjectId>')
+    if space_ref:
+        parts.append(f'<AdjacentSpaceId spaceIdRef="{xml_escape(space_ref, _ATTR_ESC)}"/>')
+    if adj_ref:
+        parts.append(f'<AdjacentSpaceId spaceIdRef="{xml_escape(adj_ref, _ATTR_ESC)}"/>')
+    az, tilt = w["azimuth"], w["tilt"]
+    # RectangularGeometry — EnergyPro reads area and orientation from here
+    parts.append(_format_rect_geometry(az, tilt, w["rg_width"], w["rg_height"]))
+    for o in openings:
+        wt_id = window_types.get((o["ufactor"], o["shgc"])) if o["ufactor"] is not None else None
+        parts.append(_format_opening(o, az, tilt, wt_id))
+    parts.append("</Surface>")
+    return "".join(parts)
+
+
+def _pad(row, n):
+    """Pad or trim a sheet row to exactly n fields.
+
+    Both readers hand rows over as lists, so the pad branch converts to
+    a tuple before concatenating. Short rows are the rare case; the
+    common path is a single len check before unpacking.
+    """
+    m = len(row)
+    if m == n:
+        return row
+    return tuple(row[:n]) + (None,) * (n - m) if m < n else row[:n]
+
+
+_TEMPLATE_TABS = ("Project", "Zones", "Walls", "Openings")
+
+
+def _read_tab(xlsx_path, name):
+    """Parse one template tab into a list of row lists.
+
+    Prefers python-calamine, which parses xlsx in native code at close to
+    I/O speed; falls back to openpyxl read-only streaming when it is not
+    installed. openpyxl is still used for create_template, which needs
+    the styling API.
+    """
+    if CalamineWorkbook is not None:
+        # skip_empty_area=False keeps absolute row numbers (the Project
+        # tab intentionally leaves row 1 blank). calamine reads every
+        # numeric cell as a float; fold integral ones back to int so the
+        # output matches the openpyxl path (id="1", not id="1.0").
+        sheet = CalamineWorkbook.from_path(xlsx_path).get_sheet_by_name(name)
+        return [[int(v) if v.__class__ is float and v.is_integer() else v
+                 for v in row]
+                for row in sheet.to_python(skip_empty_area=False)]
+    wb = openpyxl.load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        return [list(row) for row in wb[name].iter_rows(values_only=True)]
+    finally:
+        # Read-only mode keeps the zip handle open until we release it.
+        wb.close()
+
+
+def _sheet_rows(xlsx_path):
+    """Return {tab name: list of row lists} for the four template tabs.
+
+    The tabs are independent, so they parse in parallel threads — the
+    decompression and XML work runs in native code that releases the GIL.
+    Each worker opens its own handle; neither reader is thread-safe to
+    share.
+    """
+    with ThreadPoolExecutor(max_workers=len(_TEMPLATE_TABS)) as ex:
+        tab_rows = ex.map(functools.partial(_read_tab, xlsx_path), _TEMPLATE_TABS)
+        return dict(zip(_TEMPLATE_TABS, tab_rows))
+
+
+def generate_gbxml(xlsx_path: str, out_path: str, pretty: bool = False):
+    """Generate a gbXML file from a filled-in Excel template.
+
+    Output is incremental: each surface/space fragment is written to disk
+    as soon as it is composed, so peak memory stays flat no matter how
+    many rows the workbook holds.
+    """
+    sheets = _sheet_rows(xlsx_path)
 
     # -- Project info --
-    ws_proj = wb["Project"]
-    def proj(r): return str(ws_proj.cell(row=r, column=2).value or "")
+    proj_rows = sheets["Project"]
+    def proj(r):
+        row = proj_rows[r - 1] if r <= len(proj_rows) else ()
+        return str((row[1] if len(row) > 1 else None) or "")
 
     project_name    = proj(2)
     address         = proj(3)
@@ -258,14 +509,15 @@ def generate_gbxml(xlsx_path: str, out_path: str):
     front_orient    = proj(6)
 
     # -- Zones --
-    ws_zones = wb["Zones"]
     zones = []
     zone_height = {}  # zone_id -> ceiling height (for wall geometry calc)
-    for row in ws_zones.iter_rows(min_row=2, values_only=True):
-        if not row[0] or str(row[0]).startswith("#"): continue
-        zid, name, area, height, ctype, occ = (list(row) + [None]*6)[:6]
-        if not zid: continue
-        zid = str(zid).strip().replace(" ", "_")
+    # Filter comment/blank rows in one comprehension pass; the parse loop
+    # below then runs with no per-row continue checks.
+    zone_rows = [row for row in sheets["Zones"][1:]
+                 if row and row[0] and not str(row[0]).startswith("#")]
+    for row in zone_rows:
+        zid, name, area, height, ctype, occ = _pad(row, 6)
+        zid = _norm_id(zid)
         h = float(height or 9)
         zone_height[zid] = h
         zones.append({
@@ -278,52 +530,56 @@ def generate_gbxml(xlsx_path: str, out_path: str):
         })
 
     # -- Walls --
-    ws_walls = wb["Walls"]
-    walls = []
-    for row in ws_walls.iter_rows(min_row=2, values_only=True):
-        if not row[0] or str(row[0]).startswith("#"): continue
-        wid, zid, name, wtype, orient, area, construction, adj_zone = (list(row) + [None]*8)[:8]
-        if not wid: continue
-        wid  = str(wid).strip().replace(" ", "_")
-        zid  = str(zid or "").strip().replace(" ", "_")
+    wall_rows = [row for row in sheets["Walls"][1:]
+                 if row and row[0] and not str(row[0]).startswith("#")]
+    raw_walls = []
+    for row in wall_rows:
+        wid, zid, name, wtype, orient, area, construction, adj_zone = _pad(row, 8)
+        wid  = _norm_id(wid)
+        zid  = _norm_id(zid)
         stype = resolve_surface_type(wtype or "Exterior Wall")
-        gross_area = math.ceil(float(area or 0))
-        h = zone_height.get(zid, 9.0)
-
-        # Rectangular geometry dimensions
-        if stype in HORIZONTAL_SURFACES:
-            # Flat surface — use square approximation
-            side = math.sqrt(gross_area) if gross_area > 0 else 1.0
-            rg_width, rg_height = side, side
-        else:
-            # Vertical wall — height = zone ceiling height, width = area / height
-            rg_height = h
-            rg_width  = (gross_area / h) if h > 0 else gross_area
-
-        walls.append({
-            "id":           wid,
-            "zone_id":      zid,
-            "name":         str(name or wid),
-            "surface_type": stype,
-            "azimuth":      resolve_azimuth(orient),
-            "tilt":         tilt_for_surface(stype),
-            "area":         gross_area,
-            "rg_width":     rg_width,
-            "rg_height":    rg_height,
-            "construction": str(construction or ""),
-            "adj_zone":     str(adj_zone or "").strip().replace(" ", "_"),
-        })
+        raw_walls.append((wid, zid, name, stype, orient, area, construction, adj_zone))
+
+    # Rectangular geometry dimensions, vectorized: a handful of C-level
+    # array ops replace the per-row Python arithmetic.
+    n = len(raw_walls)
+    areas   = np.ceil(np.fromiter((float(r[5] or 0) for r in raw_walls), np.float64, n))
+    heights = np.fromiter((zone_height.get(r[1], 9.0) for r in raw_walls), np.float64, n)
+    horiz   = np.fromiter((_IS_HORIZONTAL[r[3]] for r in raw_walls), bool, n)
+    rg_widths, rg_heights, tilts = _derive_geom(areas, heights, horiz)
+
+    # Struct-of-arrays wall table: one contiguous record array instead of
+    # a ~300-byte dict per row. Downstream access keeps the same w["name"]
+    # spelling, and the numeric columns drop straight in from the arrays
+    # computed above.
+    wall_dtype = np.dtype([
+        ("id", "O"), ("zone_id", "O"), ("name", "O"), ("surface_type", "O"),
+        ("azimuth", "f8"), ("tilt", "f8"), ("area", "f8"),
+        ("rg_width", "f8"), ("rg_height", "f8"),
+        ("construction", "O"), ("adj_zone", "O"),
+    ])
+    walls = np.empty(n, dtype=wall_dtype)
+    walls["id"]           = [r[0] for r in raw_walls]
+    walls["zone_id"]      = [r[1] for r in raw_walls]
+    walls["name"]         = [str(r[2] or r[0]) for r in raw_walls]
+    walls["surface_type"] = [r[3] for r in raw_walls]
+    walls["azimuth"]      = [resolve_azimuth(r[4]) for r in raw_walls]
+    walls["tilt"]         = tilts
+    walls["area"]         = areas
+    walls["rg_width"]     = rg_widths
+    walls["rg_height"]    = rg_heights
+    walls["construction"] = [str(r[6] or "") for r in raw_walls]
+    walls["adj_zone"]     = [_norm_id(r[7]) for r in raw_walls]
 
     # -- Openings --
-    ws_open = wb["Openings"]
+    opening_rows = [row for row in sheets["Openings"][1:]
+                    if row and row[0] and not str(row[0]).startswith("#")]
     openings = []
-    for row in ws_open.iter_rows(min_row=2, values_only=True):
-        if not row[0] or str(row[0]).startswith("#"): continue
-        oid, wall_id, name, otype, area, ufactor, shgc = (list(row) + [None]*7)[:7]
-        if not oid: continue
+    for row in opening_rows:
+        oid, wall_id, name, otype, area, ufactor, shgc = _pad(row, 7)
         openings.append({
-            "id":      str(oid).strip().replace(" ", "_"),
-            "wall_id": str(wall_id or "").strip().replace(" ", "_"),
+            "id":      _norm_id(oid),
+            "wall_id": _norm_id(wall_id),
             "name":    str(name or oid),
             "type":    resolve_opening_type(otype or "Window"),
             "area":    math.ceil(float(area or 0)),
@@ -331,9 +587,9 @@ def generate_gbxml(xlsx_path: str, out_path: str):
             "shgc":    float(shgc)    if shgc    not in ("", None) else None,
         })
 
-    openings_by_wall = {}
+    openings_by_wall = defaultdict(list)
     for o in openings:
-        openings_by_wall.setdefault(o["wall_id"], []).append(o)
+        openings_by_wall[o["wall_id"]].append(o)
 
     # Build unique WindowType definitions keyed by (ufactor, shgc)
     window_types = {}   # (ufactor, shgc) -> wt_id
@@ -345,42 +601,7 @@ def generate_gbxml(xlsx_path: str, out_path: str):
                 s  = f"{o['shgc']:.3f}".replace(".", "") if o["shgc"] is not None else "NA"
                 window_types[key] = f"WT-U{u}-S{s}"
 
-    # -- Build gbXML tree --
-    root = ET.Element("gbXML", {
-        "xmlns":           "http://www.gbxml.org/schema",
-        "temperatureUnit": "F",
-        "lengthUnit":      "Feet",
-        "areaUnit":        "SquareFeet",
-        "volumeUnit":      "CubicFeet",
-        "version":         "6.01",
-    })
-
-    # WindowType definitions (at root level)
-    for (ufactor, shgc), wt_id in window_types.items():
-        wt = ET.SubElement(root, "WindowType", {"id": wt_id})
-        u_label = f"U-{ufactor:.2f}"
-        s_label = f" SHGC-{shgc:.2f}" if shgc is not None else ""
-        ET.SubElement(wt, "Name").text    = u_label + s_label
-        ET.SubElement(wt, "Uvalue").text  = str(ufactor)
-        if shgc is not None:
-            ET.SubElement(wt, "SHGC").text = str(shgc)
-
-    campus = ET.SubElement(root, "Campus", {"id": "campus-1"})
-    ET.SubElement(campus, "Name").text = project_name
-    if address:
-        ET.SubElement(campus, "Location").text = address
-    if climate_zone:
-        ET.SubElement(campus, "ClimateZone").text = climate_zone
-
     total_area = sum(z["area"] for z in zones)
-    building = ET.SubElement(campus, "Building", {
-        "id":           "building-1",
-        "buildingType": building_type,
-    })
-    ET.SubElement(building, "Name").text = project_name
-    ET.SubElement(building, "Area").text = str(total_area)
-    if front_orient:
-        ET.SubElement(building, "Azimuth").text = str(resolve_azimuth(front_orient))
 
     # Spaces — use room name as the id so EnergyPro shows room names
     # Build a map from zone_id -> sanitized name for cross-references
@@ -389,67 +610,64 @@ def generate_gbxml(xlsx_path: str, out_path: str):
         safe_name = z["name"].replace(" ", "_").replace("/", "-")
         zone_id_to_name[z["id"]] = safe_name
 
-    for z in zones:
-        safe_name = zone_id_to_name[z["id"]]
-        attrs = {
-            "id":           safe_name,
-            "zoneIdRef":    safe_name,
-            "conditionType": z["cond_type"],
-        }
-        if z["occ_type"]:
-            attrs["occupancyType"] = z["occ_type"]
-        space = ET.SubElement(building, "Space", attrs)
-        ET.SubElement(space, "Name").text         = z["name"]
-        ET.SubElement(space, "Area").text         = str(z["area"])
-        ET.SubElement(space, "Volume").text       = str(round(z["area"] * z["height"], 2))
-        ET.SubElement(space, "CeilingHeight").text = str(z["height"])
-
-    # Surfaces (at Campus level)
-    for w in walls:
-        surf = ET.SubElement(campus, "Surface", {
-            "id":          w["id"],
-            "surfaceType": w["surface_type"],
-        })
-        ET.SubElement(surf, "Name").text = w["name"]
-
-        if w["construction"]:
-            ET.SubElement(surf, "CADObjectId").text = w["construction"]
-
-        if w["zone_id"]:
-            space_ref = zone_id_to_name.get(w["zone_id"], w["zone_id"])
-            ET.SubElement(surf, "AdjacentSpaceId", {"spaceIdRef": space_ref})
-        if w["adj_zone"]:
-            adj_ref = zone_id_to_name.get(w["adj_zone"], w["adj_zone"])
-            ET.SubElement(surf, "AdjacentSpaceId", {"spaceIdRef": adj_ref})
-
-        # RectangularGeometry — EnergyPro reads area and orientation from here
-        add_rect_geometry(surf, w["azimuth"], w["tilt"], w["rg_width"], w["rg_height"])
-
-        # Openings
-        for o in openings_by_wall.get(w["id"], []):
-            attrs = {"id": o["id"], "openingType": o["type"]}
-            if o["ufactor"] is not None:
-                wt_id = window_types.get((o["ufactor"], o["shgc"]))
-                if wt_id:
-                    attrs["windowTypeIdRef"] = wt_id
-            opening = ET.SubElement(surf, "Opening", attrs)
-            ET.SubElement(opening, "Name").text = o["name"]
-            # RectangularGeometry — EnergyPro reads area from Width x Height
-            side = math.sqrt(o["area"]) if o["area"] > 0 else 1.0
-            add_rect_geometry(opening, w["azimuth"], w["tilt"], side, side)
-
-    # -- Write pretty XML --
-    rough  = ET.tostring(root, encoding="unicode")
-    rough  = rough.replace(' xmlns=""', '').replace(" xmlns=''", '')
-    pretty = minidom.parseString(rough).toprettyxml(indent="  ")
-    lines  = pretty.split("\n")
-    if lines[0].startswith("<?xml"):
-        lines[0] = '<?xml version="1.0" encoding="utf-8"?>'
-    output = "\n".join(lines)
-    output = output.replace(' xmlns=""', '').replace(" xmlns=''", '')
-
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(output)
+    # -- Stream gbXML to disk --
+    # Fragments go straight to the file as they are composed; there is no
+    # document tree to build, serialize or free.
+    # A 1 MiB buffer batches the many small fragment writes into large
+    # block writes instead of one syscall per fragment.
+    with open(out_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        write = f.write
+        write('<?xml version="1.0" encoding="utf-8"?>\n')
+        # The default namespace is declared once on the root; child
+        # fragments carry no declaration, so nothing ever emits xmlns=""
+        # and no post-hoc scrubbing pass is needed.
+        write(f'<gbXML xmlns="{GBXML_NS}" temperatureUnit="F" lengthUnit="Feet"'
+              ' areaUnit="SquareFeet" volumeUnit="CubicFeet" version="6.01">')
+
+        # WindowType definitions (at root level)
+        for (ufactor, shgc), wt_id in window_types.items():
+            write(_format_window_type(wt_id, ufactor, shgc))
+
+        write('<Campus id="campus-1">')
+        write(f"<Name>{xml_escape(project_name)}</Name>")
+        if address:
+            write(f"<Location>{xml_escape(address)}</Location>")
+        if climate_zone:
+            write(f"<ClimateZone>{xml_escape(climate_zone)}</ClimateZone>")
+
+        write(f'<Building id="building-1" buildingType="{xml_escape(building_type, _ATTR_ESC)}">')
+        write(f"<Name>{xml_escape(project_name)}</Name><Area>{total_area}</Area>")
+        if front_orient:
+            write(f"<Azimuth>{resolve_azimuth(front_orient)}</Azimuth>")
+
+        for z in zones:
+            write(_format_space(z, zone_id_to_name[z["id"]]))
+        write("</Building>")
+
+        # Surfaces (at Campus level). Local-bind the names used every
+        # iteration — one LOAD_FAST each instead of a global plus an
+        # attribute lookup per surface.
+        fmt_surface  = _format_surface
+        get_openings = openings_by_wall.get
+        get_ref      = zone_id_to_name.get
+        for w in walls:
+            space_ref = get_ref(w["zone_id"], w["zone_id"]) if w["zone_id"] else ""
+            adj_ref   = get_ref(w["adj_zone"], w["adj_zone"]) if w["adj_zone"] else ""
+            write(fmt_surface(w, get_openings(w["id"], ()),
+                              space_ref, adj_ref, window_types))
+
+        write("</Campus></gbXML>")
+
+    if pretty:
+        # Opt-in slow path for human readers: re-parse the compact output
+        # and let lxml indent it during a single C-level serialization.
+        try:
+            import lxml.etree as LET
+        except ImportError:
+            print("lxml not installed — leaving output compact")
+        else:
+            LET.ElementTree(LET.parse(out_path).getroot()).write(
+                out_path, pretty_print=True, xml_declaration=True, encoding="utf-8")
 
     print(f"gbXML generated: {out_path}")
     print(f"  {len(zones)} zone(s), {len(walls)} surface(s), {len(openings)} opening(s)")
@@ -461,9 +679,15 @@ def generate_gbxml(xlsx_path: str, out_path: str):
 
 def main():
     args = sys.argv[1:]
+    pretty = "--pretty" in args
+    if pretty:
+        args.remove("--pretty")
+    regenerate = "--regenerate-template" in args
+    if regenerate:
+        args.remove("--regenerate-template")
     if not args:
         template_path = os.path.join(SCRIPT_DIR, "T24 Input Template.xlsx")
-        create_template(template_path)
+        create_template(template_path, regenerate=regenerate)
         print("\nFill in the template, then run:")
         print('  python generate_gbxml.py "T24 Input Template.xlsx"')
         return
@@ -476,7 +700,7 @@ def main():
         sys.exit(1)
 
     out_path = args[1] if len(args) >= 2 else os.path.splitext(xlsx_path)[0] + ".xml"
-    generate_gbxml(xlsx_path, out_path)
+    generate_gbxml(xlsx_path, out_path, pretty=pretty)
 
 
 if __name__ == "__main__":
@@ -55,6 +55,22 @@ echo.
 echo   Close this window to stop.
 echo.
 
+rem One-time dependency check: bail with the install command instead of
+rem letting viewer_server.py die on a raw ImportError.
+python -c "import flask, openpyxl, orjson, numpy" >nul 2>&1
+if errorlevel 1 (
+    echo   Missing Python packages - installing from requirements.txt...
+    echo.
+    python -m pip install -r requirements.txt
+    if errorlevel 1 (
+        echo.
+        echo   Install failed. Run this manually, then re-run run.bat:
+        echo     python -m pip install -r requirements.txt
+        pause
+        exit /b 1
+    )
+)
+
 if not "%~1"=="" (
     python viewer_server.py --search-dir "%~1"
 ) else (
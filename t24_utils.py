@@ -28,14 +28,12 @@ def parse_azimuth(s):
         return float(ORIENTATION_MAP.get(str(s).strip().lower(), 0))
 
 
+# Cardinal names in 45° steps clockwise from North.
+_CARDINALS = ('North', 'NE', 'East', 'SE', 'South', 'SW', 'West', 'NW')
+
+
 def az_to_cardinal(az):
     """Return compass direction string for the azimuth."""
-    az = az % 360
-    if az < 22.5 or az >= 337.5: return 'North'
-    if az < 67.5:  return 'NE'
-    if az < 112.5: return 'East'
-    if az < 157.5: return 'SE'
-    if az < 202.5: return 'South'
-    if az < 247.5: return 'SW'
-    if az < 292.5: return 'West'
-    return 'NW'
+    # Branchless: shift by half a sector (22.5°), bucket into 45° steps,
+    # and wrap 360° back to North with the & 7.
+    return _CARDINALS[int((az % 360 + 22.5) // 45) & 7]
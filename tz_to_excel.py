@@ -19,9 +19,12 @@ How it works:
     7. Multiple JSONs: merges zones/walls/openings from all files
 """
 
-import sys, os, json, math, glob
+import sys, os, math, glob
+import numpy as np
+import orjson
 import openpyxl
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from t24_utils import az_to_cardinal
@@ -30,13 +33,20 @@ from t24_utils import az_to_cardinal
 IN_PER_FT = 12.0          # Drawing units are inches
 OPENING_ASSIGN_TOL = 120.0 # Inches – max distance to assign opening to a wall
 
+# ── Excel styles — immutable singletons shared by every cell ──────────────────
+HDR_FILL = PatternFill("solid", fgColor="1F4E79")
+HDR_FONT = Font(bold=True, color="FFFFFF")
+VAL_FILL = PatternFill("solid", fgColor="EBF3FB")
+CTR      = Alignment(horizontal="center", wrap_text=True)
+
 # ── Geometry helpers ──────────────────────────────────────────────────────────
 
 def in2ft(v):
     return v / IN_PER_FT
 
 def pts_in_ft(pts):
-    return [[in2ft(p[0]), in2ft(p[1])] for p in pts]
+    # One SIMD divide over the whole polygon beats per-vertex in2ft calls.
+    return (np.asarray(pts, dtype=np.float64) / IN_PER_FT).tolist()
 
 def seg_length_in(p1, p2):
     return math.sqrt((p2[0]-p1[0])**2 + (p2[1]-p1[1])**2)
@@ -44,37 +54,53 @@ def seg_length_in(p1, p2):
 def seg_length_ft(p1, p2):
     return seg_length_in(p1, p2) / IN_PER_FT
 
-def point_in_polygon(pt, poly):
-    x, y = pt[0], pt[1]
-    n = len(poly)
+# The two innermost kernels take flat float64 arrays / scalars (rather
+# than lists of point pairs) so numba can compile them; the plain-Python
+# definitions double as the fallback when numba is not installed.
+
+def _point_in_polygon_py(x, y, poly_x, poly_y):
+    n = poly_x.shape[0]
     inside = False
     j = n - 1
     for i in range(n):
-        xi, yi = poly[i]
-        xj, yj = poly[j]
+        xi, yi = poly_x[i], poly_y[i]
+        xj, yj = poly_x[j], poly_y[j]
         if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
             inside = not inside
         j = i
     return inside
 
-def pt_to_seg_dist(pt, p1, p2):
-    """Perpendicular distance from pt to infinite line through p1→p2, and projection param t."""
-    dx = p2[0] - p1[0]
-    dy = p2[1] - p1[1]
-    if dx == 0 and dy == 0:
-        return math.sqrt((pt[0]-p1[0])**2 + (pt[1]-p1[1])**2), 0.5
-    t = ((pt[0]-p1[0])*dx + (pt[1]-p1[1])*dy) / (dx*dx + dy*dy)
+def _pt_to_seg_dist_py(px, py, x1, y1, x2, y2):
+    """Distance from (px, py) to segment (x1, y1)→(x2, y2), and projection param t."""
+    dx = x2 - x1
+    dy = y2 - y1
+    if dx == 0.0 and dy == 0.0:
+        return math.sqrt((px-x1)**2 + (py-y1)**2), 0.5
+    t = ((px-x1)*dx + (py-y1)*dy) / (dx*dx + dy*dy)
     t = max(0.0, min(1.0, t))
-    cx = p1[0] + t * dx
-    cy = p1[1] + t * dy
-    return math.sqrt((pt[0]-cx)**2 + (pt[1]-cy)**2), t
+    cx = x1 + t * dx
+    cy = y1 + t * dy
+    return math.sqrt((px-cx)**2 + (py-cy)**2), t
+
+try:
+    from numba import njit
+    point_in_polygon = njit(cache=True)(_point_in_polygon_py)
+    pt_to_seg_dist   = njit(cache=True)(_pt_to_seg_dist_py)
+    # Warm up at import so the (cached) compile never lands mid-run.
+    _warm = np.zeros(3)
+    point_in_polygon(0.0, 0.0, _warm, _warm)
+    pt_to_seg_dist(0.0, 0.0, 0.0, 0.0, 1.0, 1.0)
+except ImportError:
+    point_in_polygon = _point_in_polygon_py
+    pt_to_seg_dist   = _pt_to_seg_dist_py
 
 # ── Main processing ───────────────────────────────────────────────────────────
 
 def process(json_path, skip_interior=False):
-    with open(json_path, 'r', encoding='utf-8') as f:
-        raw = f.read()
-    data = json.loads(raw)
+    # orjson parses in native code — the stdlib parser is a measurable
+    # chunk of startup on drawings with thousands of walls.
+    with open(json_path, 'rb') as f:
+        data = orjson.loads(f.read())
 
     zones    = data.get('zones', [])
     openings = data.get('openings', [])
@@ -90,7 +116,7 @@ def process(json_path, skip_interior=False):
         zone_id  = w.get('zone_id', '')
         az       = w.get('azimuth', 0.0)
         area     = w.get('area_sqft', 0.0)
-        az_name  = az_to_name(az)
+        az_name  = az_to_cardinal(az)
 
         all_walls.append({
             'zone_id':     zone_id,
@@ -137,6 +163,33 @@ def process(json_path, skip_interior=False):
     all_walls.extend(horiz_rows)
 
     # ── Assign openings to zones and walls ────────────────────────────────
+    # Precompute segment arrays for the vertical walls once so each
+    # opening's nearest-wall search is a single NumPy broadcast instead of
+    # a Python loop over every wall (O(openings × walls) scalar math).
+    vertical_walls = [w for w in all_walls if w['p1'] is not None]
+    if vertical_walls:
+        P1 = np.array([w['p1'] for w in vertical_walls], dtype=np.float64)
+        P2 = np.array([w['p2'] for w in vertical_walls], dtype=np.float64)
+        D  = P2 - P1
+        LL = (D * D).sum(1)
+        LL[LL == 0.0] = 1.0   # guard degenerate zero-length segments
+        wall_ids = [w['wall_id'] for w in vertical_walls]
+        # Bin wall indices by zone so each opening only considers its own
+        # zone's segments instead of masking the full wall set every time.
+        idx_by_zone = {}
+        for i, w in enumerate(vertical_walls):
+            idx_by_zone.setdefault(w['zone_id'], []).append(i)
+        idx_by_zone = {z: np.array(ix) for z, ix in idx_by_zone.items()}
+
+    # Axis-aligned bounding box per zone: four comparisons reject most
+    # zones before the O(vertices) ray cast has to run. The flat vertex
+    # arrays feed the compiled point_in_polygon kernel.
+    zone_bbox = []
+    for zone in zones:
+        xs = np.fromiter((v[0] for v in zone['vertices']), np.float64)
+        ys = np.fromiter((v[1] for v in zone['vertices']), np.float64)
+        zone_bbox.append((xs.min(), xs.max(), ys.min(), ys.max(), xs, ys, zone))
+
     assigned_openings = []
     for o in openings:
         otype   = o.get('type', 'Window')
@@ -149,8 +202,10 @@ def process(json_path, skip_interior=False):
         # Find containing zone (point-in-polygon, with nearest-zone fallback
         # for openings placed on or just outside the boundary edge)
         host_zone = None
-        for zone in zones:
-            if point_in_polygon(pos, zone['vertices']):
+        x, y = float(pos[0]), float(pos[1])
+        for xmin, xmax, ymin, ymax, vxs, vys, zone in zone_bbox:
+            if xmin <= x <= xmax and ymin <= y <= ymax \
+                    and point_in_polygon(x, y, vxs, vys):
                 host_zone = zone['id']
                 break
 
@@ -162,7 +217,8 @@ def process(json_path, skip_interior=False):
                 for k in range(len(verts)):
                     p1 = verts[k]
                     p2 = verts[(k + 1) % len(verts)]
-                    dist, _ = pt_to_seg_dist(pos, p1, p2)
+                    dist, _ = pt_to_seg_dist(x, y, float(p1[0]), float(p1[1]),
+                                             float(p2[0]), float(p2[1]))
                     if dist < best_zone_dist:
                         best_zone_dist = dist
                         host_zone = zone['id']
@@ -177,20 +233,22 @@ def process(json_path, skip_interior=False):
         elif otype == 'Skylight':
             # Skylight → find roof wall of the zone
             wall_id = f"{host_zone}-ROOF"
+        elif not vertical_walls:
+            wall_id = 'UNASSIGNED'
+        elif host_zone not in idx_by_zone:
+            # Zone has no vertical wall markers — nothing to attach to.
+            wall_id = 'UNASSIGNED'
         else:
-            # Window / Door → find nearest vertical wall segment in same zone
-            best_wall = None
-            best_dist = float('inf')
-            for w in all_walls:
-                if w['p1'] is None:   # skip horiz placeholders
-                    continue
-                if w['zone_id'] != host_zone:
-                    continue
-                dist, _ = pt_to_seg_dist(pos, w['p1'], w['p2'])
-                if dist < best_dist:
-                    best_dist = dist
-                    best_wall = w['wall_id']
-            wall_id = best_wall or 'UNASSIGNED'
+            # Window / Door → nearest vertical wall segment in same zone:
+            # project pos onto the zone's segments, clamp to the endpoints,
+            # take the closest.
+            idx = idx_by_zone[host_zone]
+            pos_a = np.asarray(pos, dtype=np.float64)
+            p1, d = P1[idx], D[idx]
+            T = np.clip(((pos_a - p1) * d).sum(1) / LL[idx], 0.0, 1.0)
+            C = p1 + T[:, None] * d
+            dists = np.sqrt(((pos_a - C) ** 2).sum(1))
+            wall_id = wall_ids[int(idx[dists.argmin()])]
 
         assigned_openings.append({
             'id':      oid,
@@ -206,15 +264,6 @@ def process(json_path, skip_interior=False):
     return zones, all_walls, assigned_openings, climate_zone, front_orient
 
 
-def az_to_name(az):
-    dirs = [
-        (0,   'North'), (45,  'NE'), (90,  'East'),  (135, 'SE'),
-        (180, 'South'), (225, 'SW'), (270, 'West'),  (315, 'NW')
-    ]
-    az = az % 360
-    return min(dirs, key=lambda d: abs(((az - d[0] + 180) % 360) - 180))[1]
-
-
 # ── Excel writer ──────────────────────────────────────────────────────────────
 
 def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient=0):
@@ -222,36 +271,41 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
     base     = os.path.splitext(os.path.basename(json_path))[0].replace('_t24', '')
     out_path = os.path.join(out_dir, base + '_t24_takeoff.xlsx')
 
-    wb = Workbook()
-    HDR_FILL  = PatternFill("solid", fgColor="1F4E79")
-    HDR_FONT  = Font(bold=True, color="FFFFFF")
-    VAL_FILL  = PatternFill("solid", fgColor="EBF3FB")
-    thin      = Side(style="thin")
-    BRD       = Border(left=thin, right=thin, top=thin, bottom=thin)
+    # Write-only mode streams rows straight into the xlsx instead of
+    # keeping every Cell object (plus style metadata) in memory — the
+    # canonical openpyxl path for bulk output. Rows go through a single
+    # ws.append() each; per-cell ws.cell(row, col, value) dispatch (and
+    # its coordinate parsing) is a documented hot spot on the write path.
+    wb = Workbook(write_only=True)
 
     def hdr(ws, cols):
+        row = []
         for ci, (label, width) in enumerate(cols, 1):
-            c = ws.cell(1, ci, label)
+            c = WriteOnlyCell(ws, value=label)
             c.fill = HDR_FILL; c.font = HDR_FONT
-            c.alignment = Alignment(horizontal="center", wrap_text=True)
+            c.alignment = CTR
             ws.column_dimensions[get_column_letter(ci)].width = width
+            row.append(c)
+        ws.append(row)
 
     # ── Project sheet ─────────────────────────────────────────────────────
-    ws = wb.active
-    ws.title = "Project"
+    ws = wb.create_sheet("Project")
     ws.column_dimensions["A"].width = 26
     ws.column_dimensions["B"].width = 44
-    for r, (lbl, val) in enumerate([
+    ws.append(())   # row 1 stays blank, matching the template layout
+    for lbl, val in [
         ("Project Name",      os.path.splitext(os.path.basename(json_path))[0]),
         ("Address",           ""),
         ("Climate Zone",      climate_zone),
         ("Building Type",     "MultiFamily"),
         ("Front Orientation", front_orient),
         ("Standards Version", "2022"),
-    ], start=2):
-        ws.cell(r, 1, lbl).fill = HDR_FILL
-        ws.cell(r, 1).font = HDR_FONT
-        ws.cell(r, 2, val).fill = VAL_FILL
+    ]:
+        lc = WriteOnlyCell(ws, value=lbl)
+        lc.fill = HDR_FILL; lc.font = HDR_FONT
+        vc = WriteOnlyCell(ws, value=val)
+        vc.fill = VAL_FILL
+        ws.append([lc, vc])
 
     # Check if multi-source (multiple drawings merged)
     multi = any('source' in z for z in zones)
@@ -267,7 +321,7 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
     if multi:
         zone_cols.append(("Source Drawing", 30))
     hdr(ws2, zone_cols)
-    for r, z in enumerate(zones, 2):
+    for z in zones:
         vals = [
             z['id'], z.get('name', z['id']),
             round(z.get('area_sqft', 0), 1),
@@ -277,8 +331,7 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
         ]
         if multi:
             vals.append(z.get('source', ''))
-        for ci, val in enumerate(vals, 1):
-            ws2.cell(r, ci, val)
+        ws2.append(vals)
 
     # ── Walls sheet ───────────────────────────────────────────────────────
     ws3 = wb.create_sheet("Walls")
@@ -290,7 +343,7 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
     if multi:
         wall_cols.append(("Source Drawing", 30))
     hdr(ws3, wall_cols)
-    for r, w in enumerate(walls, 2):
+    for w in walls:
         vals = [
             w['wall_id'], w['zone_id'], w['name'],
             w['type'], w.get('orientation', ''),
@@ -298,8 +351,7 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
         ]
         if multi:
             vals.append(w.get('source', ''))
-        for ci, val in enumerate(vals, 1):
-            ws3.cell(r, ci, val)
+        ws3.append(vals)
 
     # ── Openings sheet ────────────────────────────────────────────────────
     ws4 = wb.create_sheet("Openings")
@@ -310,7 +362,7 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
     if multi:
         open_cols.append(("Source Drawing", 30))
     hdr(ws4, open_cols)
-    for r, o in enumerate(openings, 2):
+    for o in openings:
         vals = [
             o['id'], o['wall_id'], o['name'], o['type'],
             o['area_sqft'],
@@ -319,8 +371,7 @@ def write_excel(json_path, zones, walls, openings, climate_zone='', front_orient
         ]
         if multi:
             vals.append(o.get('source', ''))
-        for ci, val in enumerate(vals, 1):
-            ws4.cell(r, ci, val)
+        ws4.append(vals)
 
     wb.save(out_path)
     return out_path
@@ -338,31 +389,38 @@ def write_geometry(json_path, zones, walls, openings):
     for z in zones:
         geo['zones'][z['id']] = {
             'vertices_ft':  pts_in_ft(z['vertices']),
-            'centroid_ft':  [in2ft(z['centroid'][0]), in2ft(z['centroid'][1])],
+            'centroid_ft':  pts_in_ft([z['centroid']])[0],
             'floor':        z.get('floor', 1),
             'ceiling_ht_ft': z.get('ceiling_ht_ft', 9.0),
         }
 
-    for w in walls:
-        if w['p1'] is None:
-            continue
-        geo['walls'][w['wall_id']] = {
-            'p1_ft': [in2ft(w['p1'][0]), in2ft(w['p1'][1])],
-            'p2_ft': [in2ft(w['p2'][0]), in2ft(w['p2'][1])],
-            'zone_id': w['zone_id'],
-            'azimuth': round(w['azimuth'], 1),
-        }
-
-    for o in openings:
-        pos = o.get('position', [0, 0])
-        geo['openings'][o['id']] = {
-            'position_ft': [in2ft(pos[0]), in2ft(pos[1])],
-            'type':        o['type'],
-            'wall_id':     o['wall_id'],
-        }
-
-    with open(out_path, 'w') as f:
-        json.dump(geo, f, indent=2)
+    # Convert all wall endpoints (and opening positions below) with one
+    # array divide each instead of four scalar in2ft calls per record.
+    vert_walls = [w for w in walls if w['p1'] is not None]
+    if vert_walls:
+        p1s = pts_in_ft([w['p1'] for w in vert_walls])
+        p2s = pts_in_ft([w['p2'] for w in vert_walls])
+        for w, p1_ft, p2_ft in zip(vert_walls, p1s, p2s):
+            geo['walls'][w['wall_id']] = {
+                'p1_ft': p1_ft,
+                'p2_ft': p2_ft,
+                'zone_id': w['zone_id'],
+                'azimuth': round(w['azimuth'], 1),
+            }
+
+    if openings:
+        pos_ft = pts_in_ft([o.get('position', [0, 0]) for o in openings])
+        for o, p in zip(openings, pos_ft):
+            geo['openings'][o['id']] = {
+                'position_ft': p,
+                'type':        o['type'],
+                'wall_id':     o['wall_id'],
+            }
+
+    # orjson serializes to bytes in C; keep the 2-space indent so the
+    # sidecar stays diffable and readable next to the drawing JSON.
+    with open(out_path, 'wb') as f:
+        f.write(orjson.dumps(geo, option=orjson.OPT_INDENT_2))
     return out_path
 
 
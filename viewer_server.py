@@ -1,7 +1,8 @@
 """viewer_server.py – T24 3D live viewer/editor
 Run: python viewer_server.py  →  http://localhost:5000
 """
-import sys, os, time, shutil, subprocess, threading, webbrowser, json
+import sys, os, io, gzip, mmap, time, shutil, subprocess, threading, webbrowser, json, contextlib, atexit, operator
+from concurrent.futures import ThreadPoolExecutor
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -25,20 +26,49 @@ while _i < len(sys.argv):
     else:
         _i += 1
 
-try:
-    from flask import Flask, jsonify, request, send_from_directory
-    import openpyxl
-except ImportError:
-    subprocess.run([sys.executable, "-m", "pip", "install", "flask", "openpyxl"], check=True)
-    from flask import Flask, jsonify, request, send_from_directory
-    import openpyxl
+# Fail fast on missing dependencies — install them up front with
+#   pip install -r requirements.txt
+# (the old auto-pip-install fallback paid seconds of resolver time on
+# first run and hid the real environment problem).
+from flask import Flask, Response, jsonify, request, send_file, stream_with_context
+from flask.json.provider import JSONProvider
+import openpyxl
+import orjson
 
-from t24_utils import parse_azimuth
+from t24_utils import ORIENTATION_MAP, parse_azimuth
+# Imported once at startup so /api/generate runs in-process — a fresh
+# interpreter per click spends most of its time on imports, not the work.
+import generate_gbxml as gbxml
+
+_GEN_POOL = ThreadPoolExecutor(max_workers=2)
 
 app = Flask(__name__)
 
-def azimuth(s):
-    return parse_azimuth(s)
+
+class _OrjsonProvider(JSONProvider):
+    """orjson-backed JSON provider: jsonify/request.json serialize and
+    parse in native code, with no pretty-printing on any path."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app.json = _OrjsonProvider(app)
+
+# Every likely orientation spelling resolved once at import — the
+# per-row path is a single dict hit with no strip/lower allocations.
+# parse_azimuth stays as the slow path for numbers and odd spellings.
+_AZ = {}
+for _k, _v in ORIENTATION_MAP.items():
+    for _s in (_k, _k.title(), _k.upper()):
+        _AZ[_s] = float(_v)
+
+def azimuth(s, _az=_AZ):
+    v = _az.get(s)
+    return v if v is not None else parse_azimuth(s)
 
 def flt(v, default=0.0):
     try: return float(v) if v not in (None, "") else default
@@ -49,20 +79,33 @@ def flt(v, default=0.0):
 _FILE_DIRS = {}
 _BROWSED_DIRS = {}
 
+_FIND_CACHE = [0.0, []]   # [monotonic stamp, filenames]
+
 def find_xlsx():
-    """Find all takeoff xlsx files across SCRIPT_DIR and _SEARCH_DIRS.
-    Returns list of filenames."""
+    """Find all takeoff xlsx files across the search dirs.
+    Returns list of filenames; rescans at most once per second."""
+    now = time.monotonic()
+    if now - _FIND_CACHE[0] < 1.0:
+        return _FIND_CACHE[1]
     seen = {}
-    for d in [SCRIPT_DIR] + _SEARCH_DIRS:
-        if not os.path.isdir(d):
+    for d in _SEARCH_DIRS:
+        try:
+            # scandir's DirEntry caches the dirent type — no extra stat()
+            # per file like an isfile() check on listdir names would pay.
+            with os.scandir(d) as it:
+                for e in it:
+                    n = e.name
+                    if (n.lower().endswith(".xlsx") and not n.startswith("~$")
+                            and n not in seen and e.is_file()):
+                        seen[n] = d
+        except OSError:
             continue
-        for f in os.listdir(d):
-            if f.lower().endswith(".xlsx") and not f.startswith("~$") and f not in seen:
-                seen[f] = d
     _FILE_DIRS.update(seen)
     # Browsed dirs always win
     _FILE_DIRS.update(_BROWSED_DIRS)
-    return sorted(seen.keys())
+    _FIND_CACHE[1] = sorted(seen)
+    _FIND_CACHE[0] = now
+    return _FIND_CACHE[1]
 
 def resolve_path(fn):
     """Resolve a filename to its full path, checking _FILE_DIRS then SCRIPT_DIR."""
@@ -70,53 +113,221 @@ def resolve_path(fn):
         return os.path.join(_FILE_DIRS[fn], fn)
     return os.path.join(SCRIPT_DIR, fn)
 
-def read_data(path):
-    wb = openpyxl.load_workbook(path, data_only=True)
-    p = wb["Project"]
-    project = {
-        "name": str(p.cell(2,2).value or ""),
-        "address": str(p.cell(3,2).value or ""),
-        "climate_zone": str(p.cell(4,2).value or ""),
-        "building_type": str(p.cell(5,2).value or "MultiFamily"),
-        "front_orientation": flt(p.cell(6,2).value, 0),
-        "standards_version": str(p.cell(7,2).value or "2022"),
+_PARSE_POOL = ThreadPoolExecutor(max_workers=3)
+
+def _open_ro(path):
+    # read_only streams rows instead of materializing the whole workbook —
+    # /api/data latency is dominated by this load on big takeoffs.
+    return openpyxl.load_workbook(path, data_only=True, read_only=True)
+
+def _parse_project(path):
+    wb = _open_ro(path)
+    try:
+        # One streamed pass over B2:B7 instead of six random cell reads
+        # (random access isn't supported by the read-only worksheet anyway).
+        pvals = [row[1] if len(row) > 1 else None
+                 for row in wb["Project"].iter_rows(min_row=2, max_row=7, max_col=2,
+                                                    values_only=True)]
+    finally:
+        wb.close()
+    pvals += [None] * (6 - len(pvals))
+    return {
+        "name": str(pvals[0] or ""),
+        "address": str(pvals[1] or ""),
+        "climate_zone": str(pvals[2] or ""),
+        "building_type": str(pvals[3] or "MultiFamily"),
+        "front_orientation": flt(pvals[4], 0),
+        "standards_version": str(pvals[5] or "2022"),
     }
-    zones = []
-    for i, row in enumerate(wb["Zones"].iter_rows(min_row=2, values_only=True), 2):
-        if not row[0] or str(row[0]).startswith("#"): continue
-        zid = str(row[0]).strip()
-        zones.append({"_row":i,"id":zid,"name":str(row[1] or zid),
-                       "area":flt(row[2]),"height":flt(row[3],9.0),
-                       "cond_type":str(row[4] or "Conditioned"),
-                       "occ_type":str(row[5] or "") if len(row)>5 else "",
-                       "floor":int(flt(row[6],1)) if len(row)>6 and row[6] not in (None,"") else 1})
-    walls = []
-    for i, row in enumerate(wb["Walls"].iter_rows(min_row=2, values_only=True), 2):
-        if not row[0] or str(row[0]).startswith("#"): continue
-        wid = str(row[0]).strip()
-        walls.append({"_row":i,"id":wid,"zone_id":str(row[1] or "").strip(),
-                       "name":str(row[2] or wid),"type":str(row[3] or "Exterior Wall"),
-                       "orientation":str(row[4] or ""),"azimuth":azimuth(row[4]),
-                       "area":flt(row[5]),"construction":str(row[6] or ""),
-                       "adj_zone":str(row[7] or "").strip() if len(row)>7 else ""})
-    openings = []
-    for i, row in enumerate(wb["Openings"].iter_rows(min_row=2, values_only=True), 2):
-        if not row[0] or str(row[0]).startswith("#"): continue
-        oid = str(row[0]).strip()
-        openings.append({"_row":i,"id":oid,"wall_id":str(row[1] or "").strip(),
-                          "name":str(row[2] or oid),"type":str(row[3] or "Window"),
-                          "area":flt(row[4]),
-                          "ufactor":flt(row[5],None) if row[5] not in (None,"") else None,
-                          "shgc":flt(row[6],None) if len(row)>6 and row[6] not in (None,"") else None})
-    return {"project":project,"zones":zones,"walls":walls,"openings":openings}
+
+def _parse_sheet(path, name, build):
+    """Stream one tab into row dicts. Each worker opens its own handle —
+    the zip stream inside a read-only workbook is not thread-safe to share.
+    """
+    wb = _open_ro(path)
+    try:
+        # ws.values yields plain tuples straight off the parser — no
+        # per-row ReadOnlyCell wrappers.
+        str_ = str
+        rows = []
+        add = rows.append
+        it = wb[name].values
+        next(it, None)   # header row
+        for i, row in enumerate(it, 2):
+            if not row or not row[0] or str_(row[0]).startswith("#"): continue
+            add(build(i, row))
+        return rows
+    finally:
+        wb.close()
+
+# Per-sheet field extractors: padding the row then pulling every field
+# in one C-level itemgetter call replaces eight bytecode row[n] indexes
+# and all of the len(row) guards.
+_PAD = (None,) * 8
+_zone_get = operator.itemgetter(0, 1, 2, 3, 4, 5, 6)
+_wall_get = operator.itemgetter(0, 1, 2, 3, 4, 5, 6, 7)
+_open_get = operator.itemgetter(0, 1, 2, 3, 4, 5, 6)
+
+def _zone_row(i, row):
+    rid, name, area, height, cond, occ, floor = _zone_get(row + _PAD)
+    zid = str(rid).strip()
+    return {"_row":i,"id":zid,"name":str(name or zid),
+            "area":flt(area),"height":flt(height,9.0),
+            "cond_type":str(cond or "Conditioned"),
+            "occ_type":str(occ or ""),
+            "floor":int(flt(floor,1)) if floor not in (None,"") else 1}
+
+def _wall_row(i, row):
+    rid, zid, name, wtype, orient, area, constr, adj = _wall_get(row + _PAD)
+    wid = str(rid).strip()
+    return {"_row":i,"id":wid,"zone_id":str(zid or "").strip(),
+            "name":str(name or wid),"type":str(wtype or "Exterior Wall"),
+            "orientation":str(orient or ""),"azimuth":azimuth(orient),
+            "area":flt(area),"construction":str(constr or ""),
+            "adj_zone":str(adj or "").strip()}
+
+def _opening_row(i, row):
+    rid, wall_id, name, otype, area, uf, shgc = _open_get(row + _PAD)
+    oid = str(rid).strip()
+    return {"_row":i,"id":oid,"wall_id":str(wall_id or "").strip(),
+            "name":str(name or oid),"type":str(otype or "Window"),
+            "area":flt(area),
+            "ufactor":flt(uf,None) if uf not in (None,"") else None,
+            "shgc":flt(shgc,None) if shgc not in (None,"") else None}
+
+def read_data(path):
+    # The three data tabs parse in parallel threads — the decompression
+    # and XML work runs in native code that releases the GIL, as in
+    # generate_gbxml._sheet_rows. The tiny Project tab stays on the
+    # caller's thread.
+    fz = _PARSE_POOL.submit(_parse_sheet, path, "Zones", _zone_row)
+    fw = _PARSE_POOL.submit(_parse_sheet, path, "Walls", _wall_row)
+    fo = _PARSE_POOL.submit(_parse_sheet, path, "Openings", _opening_row)
+    project = _parse_project(path)
+    return {"project": project, "zones": fz.result(),
+            "walls": fw.result(), "openings": fo.result()}
+
+# Parsed-data cache keyed by (path, mtime). The viewer polls /api/data
+# about once a second; between edits the mtime hasn't moved, so the xlsx
+# re-parse is pure waste.
+_DATA_CACHE = {}
+_BYTES_CACHE = {}    # (path, mtime) -> serialized /api/data response body
+_DATA_LOCK = threading.Lock()
+_DATA_CACHE_MAX = 8
+
+def cached_read(path):
+    """read_data with an mtime-keyed cache. Returns (data, mtime)."""
+    mt = os.path.getmtime(path)
+    key = (path, mt)
+    with _DATA_LOCK:
+        d = _DATA_CACHE.get(key)
+    if d is None:
+        d = read_data(path)
+        with _DATA_LOCK:
+            # Drop stale snapshots of this file, then bound total entries.
+            for k in [k for k in _DATA_CACHE if k[0] == path]:
+                del _DATA_CACHE[k]
+            _DATA_CACHE[key] = d
+            while len(_DATA_CACHE) > _DATA_CACHE_MAX:
+                del _DATA_CACHE[next(iter(_DATA_CACHE))]
+    return d, mt
+
+# Schema-specialized row serializers for /api/data: the row dicts have
+# fixed keys, so the key prefixes are baked into byte literals and only
+# the values are encoded per row — strings through orjson (for escaping),
+# numbers via repr. Skips a full dict iteration per row.
+
+def _jnum(v):
+    return b"null" if v is None else repr(v).encode()
+
+def _ser_zone(z, d=orjson.dumps):
+    return (b'{"_row":%d,"id":%b,"name":%b,"area":%b,"height":%b,'
+            b'"cond_type":%b,"occ_type":%b,"floor":%d}'
+            % (z["_row"], d(z["id"]), d(z["name"]), _jnum(z["area"]),
+               _jnum(z["height"]), d(z["cond_type"]), d(z["occ_type"]),
+               z["floor"]))
+
+def _ser_wall(w, d=orjson.dumps):
+    return (b'{"_row":%d,"id":%b,"zone_id":%b,"name":%b,"type":%b,'
+            b'"orientation":%b,"azimuth":%b,"area":%b,"construction":%b,'
+            b'"adj_zone":%b}'
+            % (w["_row"], d(w["id"]), d(w["zone_id"]), d(w["name"]),
+               d(w["type"]), d(w["orientation"]), _jnum(w["azimuth"]),
+               _jnum(w["area"]), d(w["construction"]), d(w["adj_zone"])))
+
+def _ser_opening(o, d=orjson.dumps):
+    return (b'{"_row":%d,"id":%b,"wall_id":%b,"name":%b,"type":%b,'
+            b'"area":%b,"ufactor":%b,"shgc":%b}'
+            % (o["_row"], d(o["id"]), d(o["wall_id"]), d(o["name"]),
+               d(o["type"]), _jnum(o["area"]), _jnum(o["ufactor"]),
+               _jnum(o["shgc"])))
+
+_ROW_SERIALIZERS = {"zones": _ser_zone, "walls": _ser_wall,
+                    "openings": _ser_opening}
+
+def _data_chunks(d, key):
+    """Stream the /api/data payload: project first, then each row array
+    element by element — first bytes leave before the big arrays are
+    serialized, and no full serialized copy exists during the stream.
+    The joined bytes land in _BYTES_CACHE once the response completes.
+    """
+    parts = []
+    emit = parts.append
+
+    def out(chunk):
+        emit(chunk)
+        return chunk
+
+    yield out(b'{"project":' + orjson.dumps(d["project"]))
+    for section in ("zones", "walls", "openings"):
+        ser = _ROW_SERIALIZERS[section]
+        yield out(b',"' + section.encode() + b'":[')
+        sep = b""
+        for row in d[section]:
+            yield out(sep + ser(row))
+            sep = b","
+        yield out(b"]")
+    yield out(b',"_file":' + orjson.dumps(d["_file"])
+              + b',"_mtime":' + orjson.dumps(d["_mtime"]) + b"}")
+
+    # Compress once at cache-fill time — the JSON is highly repetitive
+    # (fixed keys every row), so gzip cuts it severalfold and repeat
+    # polls serve the pre-compressed blob with zero per-request CPU.
+    raw = b"".join(parts)
+    gz = gzip.compress(raw, 5) if len(raw) >= 1024 else None
+    with _DATA_LOCK:
+        for k in [k for k in _BYTES_CACHE if k[0] == key[0]]:
+            del _BYTES_CACHE[k]
+        _BYTES_CACHE[key] = (raw, gz)
+
+def invalidate_cache(path):
+    with _DATA_LOCK:
+        for cache in (_DATA_CACHE, _BYTES_CACHE):
+            for k in [k for k in cache if k[0] == path]:
+                del cache[k]
 
 def coerce(v):
     if v in (None, ""): return None
-    try: return int(v) if "." not in str(v) else float(v)
-    except: return v
+    # orjson already hands numbers over typed — no str() round-trip.
+    if isinstance(v, (int, float)): return v
+    # Strip before the first-char check: int/float accept surrounding
+    # whitespace, so " 45" must still coerce to a number.
+    s = (v if isinstance(v, str) else str(v)).strip()
+    if not s: return v
+    if s[0] not in "-0123456789.":
+        return v   # obviously non-numeric: skip the raising parse
+    try: return float(s) if "." in s or "e" in s or "E" in s else int(s)
+    except ValueError: return v
+
+VIEWER_PATH = os.path.join(SCRIPT_DIR, "viewer.html")
 
 @app.route("/")
-def index(): return send_from_directory(SCRIPT_DIR, "viewer.html")
+def index():
+    # conditional=True gives ETag/If-Modified-Since handling and lets a
+    # real WSGI server use the wsgi.file_wrapper (sendfile) path. No
+    # max_age: viewer.html is edited locally, so every load should
+    # revalidate (the 304 path is the whole win here).
+    return send_file(VIEWER_PATH, conditional=True)
 
 @app.route("/api/files")
 def api_files(): return jsonify(find_xlsx())
@@ -126,13 +337,35 @@ def api_data():
     fn = request.args.get("file") or (find_xlsx() or [""])[0]
     path = resolve_path(fn)
     if not os.path.exists(path): return jsonify({"error": f"Not found: {fn}"}), 404
-    # Re-run JSON→Excel conversion if source JSON is newer
+    # Pending debounced edits must hit disk before we read or compare
+    # mtimes; then re-run JSON→Excel conversion if source JSON is newer
+    _wb_flush(path)
     maybe_reconvert(path)
     try:
-        d = read_data(path)
-        d["_file"] = fn
-        d["_mtime"] = os.path.getmtime(path)
-        return jsonify(d)
+        mt = os.path.getmtime(path)
+        # mtime fully determines the payload, so it doubles as the ETag;
+        # a matching If-None-Match turns the poll into a ~100-byte 304.
+        etag = f'W/"{mt}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={"ETag": etag})
+        key = (path, mt)
+        with _DATA_LOCK:
+            entry = _BYTES_CACHE.get(key)
+        if entry is None:
+            d, mt = cached_read(path)
+            d = dict(d)   # don't stamp request fields into the cached dict
+            d["_file"] = fn
+            d["_mtime"] = mt
+            gen = stream_with_context(_data_chunks(d, (path, mt)))
+            return Response(gen, mimetype="application/json",
+                            headers={"ETag": f'W/"{mt}"'})
+        raw, gz = entry
+        if gz is not None and "gzip" in request.headers.get("Accept-Encoding", ""):
+            return Response(gz, mimetype="application/json",
+                            headers={"ETag": etag, "Content-Encoding": "gzip",
+                                     "Vary": "Accept-Encoding"})
+        return Response(raw, mimetype="application/json",
+                        headers={"ETag": etag, "Vary": "Accept-Encoding"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -183,23 +416,94 @@ def maybe_reconvert(xlsx_path):
         pass
     return False
 
+_MTIME_CACHE = {}   # path -> (mtime, monotonic stamp)
+
 @app.route("/api/mtime")
 def api_mtime():
     fn = request.args.get("file","")
     p = resolve_path(fn)
+    # The viewer (and every extra open tab) polls about once a second;
+    # answering from a 250 ms cache dedupes the stat() bursts without
+    # the client noticing.
+    now = time.monotonic()
+    cached = _MTIME_CACHE.get(p)
+    if cached and now - cached[1] < 0.25:
+        return jsonify({"mtime": cached[0]})
     if os.path.exists(p):
         maybe_reconvert(p)
-    return jsonify({"mtime": os.path.getmtime(p) if os.path.exists(p) else 0})
+    mt = os.path.getmtime(p) if os.path.exists(p) else 0
+    _MTIME_CACHE[p] = (mt, now)
+    return jsonify({"mtime": mt})
+
+# Warm write-workbook cache: a burst of edits (rename + resize +
+# reassign) reuses one loaded workbook and pays for one save, debounced
+# until the edits go quiet. The global lock also serializes mutations.
+_WB_CACHE = {}        # path -> [wb, pending Timer or None, dirty flag]
+_WB_LOCK = threading.Lock()
+_WB_SAVE_DELAY = 0.5
+
+def _wb_flush(path):
+    """Save (if dirty) and evict the warm workbook for path."""
+    with _WB_LOCK:
+        entry = _WB_CACHE.pop(path, None)
+        if entry is None:
+            return
+        wb, timer, dirty = entry
+        if timer is not None:
+            timer.cancel()
+        # Saving inside the lock keeps a concurrent mutation from
+        # reloading the file mid-save and losing this batch.
+        if dirty:
+            wb.save(path)
+            invalidate_cache(path)
+
+def _wb_flush_all():
+    for p in list(_WB_CACHE):
+        _wb_flush(p)
+
+atexit.register(_wb_flush_all)
+
+def mutate_workbook(path, fn):
+    """Apply fn(wb) -> (dirty, result) to the warm workbook for path and
+    (re)arm the debounced save when it reports a real change."""
+    with _WB_LOCK:
+        entry = _WB_CACHE.get(path)
+        if entry is None:
+            wb = openpyxl.load_workbook(path, keep_vba=False, keep_links=False)
+            entry = _WB_CACHE[path] = [wb, None, False]
+        if entry[1] is not None:
+            entry[1].cancel()
+            entry[1] = None
+        dirty, result = fn(entry[0])
+        entry[2] = entry[2] or dirty
+        if entry[2]:
+            t = threading.Timer(_WB_SAVE_DELAY, _wb_flush, args=(path,))
+            t.daemon = True
+            t.start()
+            entry[1] = t
+    return result
 
 @app.route("/api/update", methods=["POST"])
 def api_update():
     d = request.json
     path = resolve_path(d["file"])
+    # Accepts a single {sheet,row,col,value} or a batch under "updates";
+    # a batch pays the load+save round-trip once for all edits.
+    updates = d.get("updates") or [d]
     try:
-        wb = openpyxl.load_workbook(path)
-        wb[d["sheet"]].cell(int(d["row"]), int(d["col"]), coerce(d["value"]))
-        wb.save(path)
-        return jsonify({"ok": True})
+        def apply(wb):
+            changed = False
+            for u in updates:
+                cell = wb[u["sheet"]].cell(int(u["row"]), int(u["col"]))
+                new = coerce(u["value"])
+                # Blur events often post the unchanged value — don't
+                # mark the workbook dirty when nothing actually moved.
+                if cell.value != new:
+                    cell.value = new
+                    changed = True
+            return changed, changed
+        changed = mutate_workbook(path, apply)
+        return jsonify({"ok": True, "noop": not changed})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -208,18 +512,19 @@ def api_add_row():
     d = request.json
     path = resolve_path(d["file"])
     try:
-        wb = openpyxl.load_workbook(path)
-        ws = wb[d["sheet"]]
-        # Find last non-empty, non-comment data row
-        last = 1
-        for r in range(2, ws.max_row + 1):
-            v = ws.cell(r, 1).value
-            if v and not str(v).startswith("#"): last = r
-        new_row = last + 1
-        ws.insert_rows(new_row)
-        for j, val in enumerate(d.get("values", []), 1):
-            if val not in (None, ""): ws.cell(new_row, j, coerce(val))
-        wb.save(path)
+        def apply(wb):
+            ws = wb[d["sheet"]]
+            # Find last non-empty, non-comment data row — one pass over
+            # column A instead of a ws.cell() dispatch per row.
+            col_a = next(ws.iter_cols(min_col=1, max_col=1, values_only=True), ())
+            last = max((r for r, v in enumerate(col_a, 1)
+                        if r > 1 and v and not str(v).startswith("#")), default=1)
+            new_row = last + 1
+            ws.insert_rows(new_row)
+            for j, val in enumerate(d.get("values", []), 1):
+                if val not in (None, ""): ws.cell(new_row, j, coerce(val))
+            return True, new_row
+        new_row = mutate_workbook(path, apply)
         return jsonify({"ok": True, "row": new_row})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -229,13 +534,16 @@ def api_delete_row():
     d = request.json
     path = resolve_path(d["file"])
     try:
-        wb = openpyxl.load_workbook(path)
-        wb[d["sheet"]].delete_rows(int(d["row"]))
-        wb.save(path)
+        def apply(wb):
+            wb[d["sheet"]].delete_rows(int(d["row"]))
+            return True, None
+        mutate_workbook(path, apply)
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+_GEO_CACHE = {}   # geo_path -> (mtime, compact response bytes)
+
 @app.route("/api/geometry")
 def api_geometry():
     fn = request.args.get("file", "")
@@ -246,9 +554,19 @@ def api_geometry():
     if not os.path.exists(geo_path):
         return jsonify(None)
     try:
-        import json
-        with open(geo_path) as f:
-            return jsonify(json.load(f))
+        mt = os.path.getmtime(geo_path)
+        cached = _GEO_CACHE.get(geo_path)
+        if cached and cached[0] == mt:
+            raw = cached[1]
+        else:
+            # orjson parses the mmap'd file without a read() copy; one
+            # loads/dumps round-trip validates and compacts the sidecar,
+            # then the bytes pass straight through on every later request.
+            with open(geo_path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                raw = orjson.dumps(orjson.loads(memoryview(mm)))
+            _GEO_CACHE[geo_path] = (mt, raw)
+        return Response(raw, mimetype="application/json")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -369,12 +687,20 @@ def api_generate():
     # Always put output XML next to the xlsx file
     xlsx_dir = os.path.dirname(os.path.abspath(xlsx))
     out = os.path.join(xlsx_dir, os.path.splitext(os.path.basename(xlsx))[0] + ".xml")
+    _wb_flush(xlsx)   # generation must see the latest edits
+
+    def run():
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                gbxml.generate_gbxml(xlsx, out)
+            return True, buf.getvalue()
+        except Exception as e:
+            return False, buf.getvalue() + str(e)
+
     try:
-        r = subprocess.run(
-            [sys.executable, os.path.join(SCRIPT_DIR, "generate_gbxml.py"), xlsx, out],
-            capture_output=True, text=True, timeout=30)
-        return jsonify({"ok": r.returncode==0, "output": r.stdout+r.stderr,
-                        "outfile": out})
+        ok, output = _GEN_POOL.submit(run).result(timeout=30)
+        return jsonify({"ok": ok, "output": output, "outfile": out})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -383,7 +709,16 @@ if __name__ == "__main__":
     print("  T24 3D Viewer  ->  http://localhost:5000")
     print("  Ctrl+C to stop")
     print("="*50)
-    threading.Thread(
-        target=lambda: (time.sleep(1.2), webbrowser.open("http://localhost:5000")),
-        daemon=True).start()
-    app.run(host="127.0.0.1", port=5000, debug=False, use_reloader=False)
+    # Daemon Timer instead of a sleeping thread: cancellable, doesn't
+    # hold up interpreter shutdown, and fires once the server is up.
+    _open = threading.Timer(1.0, webbrowser.open, args=("http://localhost:5000",))
+    _open.daemon = True
+    _open.start()
+    try:
+        # waitress gives a real threaded server: mtime polls keep flowing
+        # while a big xlsx parse or a generation is in flight.
+        from waitress import serve
+        serve(app, host="127.0.0.1", port=5000, threads=8)
+    except ImportError:
+        app.run(host="127.0.0.1", port=5000, debug=False,
+                use_reloader=False, threaded=True)